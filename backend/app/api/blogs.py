@@ -1,37 +1,81 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.core.db import get_db
+from app.core.db import async_session_factory, get_db, get_read_db
 from app.models.blog import BlogPost
 from app.models.comment import BlogComment
 from app.models.user import User
-from app.schemas.blog import BlogPostCreate, BlogPostResponse
+from app.schemas.blog import BlogPostCreate, BlogPostResponse, BlogSearchResponse
 from app.schemas.comment import CommentCreate, CommentResponse
+from app.db.blog import BlogCRUD
+from app.services.markdown_service import markdown_service
 from app.api.users import current_active_user, is_admin
 
 router = APIRouter()
 
+
+async def _backfill_rendered(post: BlogPost, db: AsyncSession) -> BlogPost:
+    """Render posts written before server-side rendering existed.
+
+    The request session is read-only, so the result is saved through a short
+    write session of its own and the post is detached from the read session.
+    """
+    if await markdown_service.apply(post):
+        db.expunge(post)
+        async with async_session_factory() as write_db:
+            await write_db.execute(
+                update(BlogPost)
+                .where(BlogPost.id == post.id)
+                .values(
+                    content_hash=post.content_hash,
+                    content_html=post.content_html,
+                    content_toc=post.content_toc,
+                    # A cache fill, not an edit: keep the onupdate default off
+                    updated_at=BlogPost.updated_at,
+                )
+            )
+            await write_db.commit()
+    return post
+
+
 # Public endpoints that don't require authentication
 @router.get("/public/", response_model=List[BlogPostResponse])
-async def get_public_blog_posts(db: AsyncSession = Depends(get_db)):
-    """Get all blog posts for public viewing"""
-    result = await db.execute(select(BlogPost).order_by(BlogPost.created_at.desc()))
-    return result.scalars().all()
+async def get_public_blog_posts(
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Get blog posts for public viewing, newest first (all of them unless limit is given)"""
+    return await BlogCRUD.get_posts(db, skip=skip, limit=limit)
+
+@router.get("/public/search", response_model=BlogSearchResponse)
+async def search_public_blog_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Full-text search over blog posts, ranked and highlighted"""
+    total, items = await BlogCRUD.search(db, q, skip=skip, limit=limit)
+    return {"total": total, "items": items}
 
 @router.get("/public/{post_id}", response_model=BlogPostResponse)
-async def get_public_blog_post(post_id: int, db: AsyncSession = Depends(get_db)):
+async def get_public_blog_post(post_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a specific blog post for public viewing"""
     post = await db.get(BlogPost, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    return await _backfill_rendered(post, db)
 
 # Authenticated endpoints
 @router.get("/", response_model=List[BlogPostResponse])
-async def get_blog_posts(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(BlogPost).order_by(BlogPost.created_at.desc()))
-    return result.scalars().all()
+async def get_blog_posts(
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await BlogCRUD.get_posts(db, skip=skip, limit=limit)
 
 @router.post("/", response_model=BlogPostResponse)
 async def create_blog_post(
@@ -47,17 +91,18 @@ async def create_blog_post(
         )
     
     blog_post = BlogPost(**post.model_dump())
+    await markdown_service.apply(blog_post)
     db.add(blog_post)
     await db.commit()
     await db.refresh(blog_post)
     return blog_post
 
 @router.get("/{post_id}", response_model=BlogPostResponse)
-async def get_blog_post(post_id: int, db: AsyncSession = Depends(get_db)):
+async def get_blog_post(post_id: int, db: AsyncSession = Depends(get_read_db)):
     post = await db.get(BlogPost, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    return await _backfill_rendered(post, db)
 
 @router.post("/comments/", response_model=CommentResponse)
 async def create_comment(
@@ -74,16 +119,10 @@ async def get_comments(
     post_id: int, 
     skip: int = 0, 
     limit: int = 50, 
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     # First, get all comments for this post
-    result = await db.execute(
-        select(BlogComment, User.email.label("user_name"))
-        .join(User, BlogComment.user_id == User.id)
-        .filter(BlogComment.post_id == post_id)
-        .order_by(BlogComment.created_at.asc())
-    )
-    comments = result.all()
+    comments = await BlogCRUD.get_comments(db, post_id)
     
     # Create a map of all comments
     comment_map = {}
@@ -145,6 +184,7 @@ async def update_blog_post(
     
     for key, value in post.model_dump().items():
         setattr(db_post, key, value)
+    await markdown_service.apply(db_post)
     
     await db.commit()
     await db.refresh(db_post)
@@ -2,22 +2,76 @@
 API endpoints for lead management.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+import asyncio
+import csv
+import io
+import json
+import uuid
+from datetime import date, datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select, func
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db import get_db
+from app.core.config import settings
+from app.core.db import get_db, get_read_db, new_read_session
 from app.models.lead import Lead
+from app.models.lead_rollup import LeadRollup
 from app.models.user import User
-from app.schemas.lead import LeadCreate, LeadResponse
+from app.schemas.lead import (
+    LeadAccepted, LeadCreate, LeadResponse, LeadSpoolStats,
+    LeadDailyCount, LeadValueCount,
+)
 from app.api.users import current_active_user, current_superuser
+from app.services.lead_spool import lead_spool
+from app.services.lead_writer import lead_writer
 
 
 router = APIRouter()
 
+EXPORT_COLUMNS = [
+    "id", "name", "email", "company", "business_need",
+    "intent", "urgency", "fit_score", "scored_at",
+    "created_at", "updated_at",
+]
+EXPORT_BATCH_SIZE = 1000
 
-@router.post("/", response_model=LeadResponse, status_code=status.HTTP_201_CREATED)
+
+def _filter_created(stmt, created_from: Optional[datetime], created_to: Optional[datetime]):
+    """Apply an inclusive-from, exclusive-to created_at range."""
+    if created_from is not None:
+        stmt = stmt.filter(Lead.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.filter(Lead.created_at < created_to)
+    return stmt
+
+
+def _export_row(row) -> dict:
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in row.items()
+    }
+
+
+async def _write_lead(db: AsyncSession, lead_data: dict) -> Lead:
+    if settings.LEAD_BATCH_WRITES:
+        return await lead_writer.submit(lead_data)
+    
+    lead = Lead(**lead_data)
+    db.add(lead)
+    await db.commit()
+    await db.refresh(lead)
+    return lead
+
+
+@router.post(
+    "/",
+    response_model=LeadResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": LeadAccepted}},
+)
 async def create_lead(
     lead_in: LeadCreate,
     db: AsyncSession = Depends(get_db),
@@ -26,35 +80,187 @@ async def create_lead(
     Create a new lead submission.
     
     This endpoint is public and does not require authentication.
+    With LEAD_BATCH_WRITES enabled, submissions are batched with others
+    and a repeat submission from the same email is merged into its lead.
+    If the database fails or times out, the lead is written to the local
+    spool and the request is answered with 202 instead of an error.
     """
-    lead = Lead(**lead_in.model_dump())
-    db.add(lead)
-    await db.commit()
-    await db.refresh(lead)
-    return lead
+    lead_data = lead_in.model_dump()
+    lead_data["submission_id"] = str(uuid.uuid4())
+    try:
+        return await asyncio.wait_for(
+            _write_lead(db, lead_data), timeout=settings.LEAD_WRITE_TIMEOUT_SECONDS
+        )
+    except (SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+        print(f"Lead write failed, spooling submission {lead_data['submission_id']}: {e}")
+        try:
+            await db.rollback()
+        except Exception:
+            pass
+    
+    await lead_spool.append({**lead_data, "created_at": datetime.utcnow().isoformat()})
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=LeadAccepted(**lead_in.model_dump()).model_dump(mode="json"),
+    )
 
 
 @router.get("/", response_model=List[LeadResponse])
 async def get_leads(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(current_superuser),
 ):
     """
-    Retrieve all leads.
+    Retrieve all leads, ordered by id.
+    
+    Pass the `X-Next-Cursor` header of a page as `after_id` to fetch the
+    next one; unlike `skip`, this stays fast however deep you page.
     
     This endpoint requires superuser privileges.
     """
-    result = await db.execute(select(Lead).offset(skip).limit(limit))
+    stmt = _filter_created(select(Lead), created_from, created_to).order_by(Lead.id)
+    if after_id is not None:
+        stmt = stmt.filter(Lead.id > after_id)
+    else:
+        stmt = stmt.offset(skip)
+    result = await db.execute(stmt.limit(limit))
     leads = result.scalars().all()
+    
+    if len(leads) == limit:
+        response.headers["X-Next-Cursor"] = str(leads[-1].id)
     return leads
 
 
+@router.get("/export")
+async def export_leads(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    user: User = Depends(current_superuser),
+):
+    """
+    Stream every lead as CSV or NDJSON.
+    
+    Rows are read through a server-side cursor in batches, so memory stays
+    flat regardless of table size. This endpoint requires superuser privileges.
+    """
+    # Plain column rows skip ORM identity-map bookkeeping for every lead
+    columns = [getattr(Lead, column) for column in EXPORT_COLUMNS]
+    stmt = (
+        _filter_created(select(*columns), created_from, created_to)
+        .order_by(Lead.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    async def rows():
+        # The stream outlives the request's dependencies, so it owns its session
+        async with new_read_session() as session:
+            result = await session.stream(stmt)
+            if format == "csv":
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+                writer.writeheader()
+                async for batch in result.mappings().partitions():
+                    writer.writerows(_export_row(row) for row in batch)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue()
+            else:
+                async for batch in result.mappings().partitions():
+                    yield "".join(json.dumps(_export_row(row)) + "\n" for row in batch)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"leads.{format}"
+    return StreamingResponse(
+        rows(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/spool", response_model=LeadSpoolStats)
+async def get_lead_spool_stats(user: User = Depends(current_superuser)):
+    """
+    Report the depth and replay lag of the local lead spool.
+    
+    This endpoint requires superuser privileges.
+    """
+    return lead_spool.stats()
+
+
+def _filter_days(stmt, day_from: Optional[date], day_to: Optional[date]):
+    """Apply an inclusive day range to a rollup query."""
+    if day_from is not None:
+        stmt = stmt.filter(LeadRollup.day >= day_from)
+    if day_to is not None:
+        stmt = stmt.filter(LeadRollup.day <= day_to)
+    return stmt
+
+
+@router.get("/analytics/daily", response_model=List[LeadDailyCount])
+async def get_lead_counts_by_day(
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(current_superuser),
+):
+    """
+    Lead counts per day, read from the rollup table.
+    
+    This endpoint requires superuser privileges.
+    """
+    stmt = _filter_days(
+        select(LeadRollup.day, LeadRollup.lead_count).filter(LeadRollup.dimension == "total"),
+        day_from,
+        day_to,
+    ).order_by(LeadRollup.day)
+    result = await db.execute(stmt)
+    return result.mappings().all()
+
+
+@router.get("/analytics/{dimension}", response_model=List[LeadValueCount])
+async def get_lead_counts_by_value(
+    dimension: str = Path(..., pattern="^(company|business_need)$"),
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(current_superuser),
+):
+    """
+    Top companies or business needs by lead count, read from the rollup table.
+    
+    Values are normalized (lowercased, whitespace collapsed); leads without
+    a value are grouped under an empty string.
+    This endpoint requires superuser privileges.
+    """
+    lead_count = func.sum(LeadRollup.lead_count).label("lead_count")
+    stmt = (
+        _filter_days(
+            select(LeadRollup.value, lead_count).filter(LeadRollup.dimension == dimension),
+            day_from,
+            day_to,
+        )
+        .group_by(LeadRollup.value)
+        .order_by(lead_count.desc(), LeadRollup.value)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return result.mappings().all()
+
+
 @router.get("/{lead_id}", response_model=LeadResponse)
 async def get_lead(
     lead_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(current_active_user),
 ):
     """
@@ -1,17 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 import json
 
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.models.user import User
 from app.api.users import current_active_user
 from app.schemas.project import (
-    Project, ProjectCreate, ProjectUpdate,
+    Project, ProjectCreate, ProjectUpdate, ProjectSummary,
     OnboardingForm, OnboardingFormCreate,
-    Proposal, ProposalCreate
+    Proposal, ProposalCreate, ProposalVersion
 )
 from app.db.project import ProjectCRUD
+from app.models.project import Project as ProjectModel
 from app.services.ai_service import AIService
 from app.services.file_service import FileService
 
@@ -19,6 +20,36 @@ router = APIRouter()
 ai_service = AIService()
 file_service = FileService()
 
+
+def owned_project(load_forms: bool = False, load_proposals: bool = False, db_dependency=get_db):
+    """Build a dependency resolving the path's project for the current user.
+
+    Ownership check and fetch (plus any eager loading) are one statement.
+    Projects of other users are reported as not found. Read-only handlers
+    pass ``db_dependency=get_read_db`` so the fetch can go to a replica.
+    """
+    async def dependency(
+        project_id: int,
+        db: Session = Depends(db_dependency),
+        current_user: User = Depends(current_active_user),
+    ) -> ProjectModel:
+        db_project = await ProjectCRUD.get_for_user(
+            db=db,
+            project_id=project_id,
+            user_id=current_user.id,
+            load_forms=load_forms,
+            load_proposals=load_proposals,
+        )
+        if db_project is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        return db_project
+
+    return dependency
+
+
+get_owned_project = owned_project()
+read_owned_project = owned_project(db_dependency=get_read_db)
+
 # Project endpoints
 @router.post("/", response_model=Project, status_code=status.HTTP_201_CREATED)
 async def create_project(
@@ -26,59 +57,59 @@ async def create_project(
     db: Session = Depends(get_db),
     current_user: User = Depends(current_active_user)
 ):
-    return await ProjectCRUD.create(db=db, user_id=current_user.id, project_in=project_data)
+    db_project = await ProjectCRUD.create(db=db, user_id=current_user.id, project_in=project_data)
+    await db.commit()
+    return db_project
 
 @router.get("/", response_model=List[Project])
 async def read_projects(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(current_active_user)
 ):
     return await ProjectCRUD.get_multi(db=db, user_id=current_user.id, skip=skip, limit=limit)
 
-@router.get("/{project_id}", response_model=Project)
-async def read_project(
-    project_id: int,
-    db: Session = Depends(get_db),
+@router.get("/dashboard", response_model=List[ProjectSummary])
+async def read_project_dashboard(
+    response: Response,
+    before_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(current_active_user)
 ):
-    db_project = await ProjectCRUD.get(db=db, project_id=project_id)
-    if db_project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
-    if db_project.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this project")
+    """Projects with proposal and onboarding summaries, newest first.
+
+    Pass the X-Next-Cursor header of a page as before_id for the next page.
+    """
+    projects = await ProjectCRUD.get_dashboard(
+        db=db, user_id=current_user.id, before_id=before_id, limit=limit
+    )
+    if len(projects) == limit:
+        response.headers["X-Next-Cursor"] = str(projects[-1]["id"])
+    return projects
+
+@router.get("/{project_id}", response_model=Project)
+async def read_project(db_project: ProjectModel = Depends(read_owned_project)):
     return db_project
 
 @router.put("/{project_id}", response_model=Project)
 async def update_project(
-    project_id: int,
     project_update: ProjectUpdate,
+    db_project: ProjectModel = Depends(get_owned_project),
     db: Session = Depends(get_db),
-    current_user: User = Depends(current_active_user)
 ):
-    db_project = await ProjectCRUD.get(db=db, project_id=project_id)
-    if db_project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
-    if db_project.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this project")
-    return await ProjectCRUD.update(db=db, project_id=project_id, project_in=project_update)
+    db_project = await ProjectCRUD.update(db=db, project=db_project, project_in=project_update)
+    await db.commit()
+    return db_project
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
-    project_id: int,
+    db_project: ProjectModel = Depends(get_owned_project),
     db: Session = Depends(get_db),
-    current_user: User = Depends(current_active_user)
 ):
-    db_project = await ProjectCRUD.get(db=db, project_id=project_id)
-    if db_project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
-    if db_project.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this project")
-    
-    success = await ProjectCRUD.delete(db=db, project_id=project_id)
-    if not success:
-        raise HTTPException(status_code=500, detail="Failed to delete project")
+    await ProjectCRUD.delete(db=db, project=db_project)
+    await db.commit()
     return None
 
 # Onboarding form endpoints
@@ -87,16 +118,9 @@ async def create_onboarding_form(
     project_id: int,
     form_data: str = Form(...),
     file: Optional[UploadFile] = File(None),
+    db_project: ProjectModel = Depends(get_owned_project),
     db: Session = Depends(get_db),
-    current_user: User = Depends(current_active_user)
 ):
-    # Check if project exists and belongs to user
-    db_project = await ProjectCRUD.get(db=db, project_id=project_id)
-    if db_project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
-    if db_project.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this project")
-    
     # Parse form data
     try:
         parsed_form_data = json.loads(form_data)
@@ -108,28 +132,24 @@ async def create_onboarding_form(
     if file:
         file_path = await file_service.save_upload(file, project_id)
     
+    # Extract data from PDF before writing, so the form and its
+    # extraction are stored by a single INSERT
+    extracted_data = None
+    processing_status = None
+    if file_path and file_path.endswith('.pdf'):
+        extracted_data = ai_service.extract_data_from_pdf(file_path)
+        processing_status = "completed"
+    
     # Create onboarding form
     form_create = OnboardingFormCreate(
         project_id=project_id,
         form_data=parsed_form_data,
-        file_path=file_path
+        file_path=file_path,
+        extracted_data=extracted_data,
+        processing_status=processing_status
     )
     db_form = await ProjectCRUD.create_onboarding_form(db=db, form=form_create)
-    
-    # Process file if provided
-    if file_path and file_path.endswith('.pdf'):
-        # Extract data from PDF
-        extracted_data = ai_service.extract_data_from_pdf(file_path)
-        
-        # Update form with extracted data
-        db_form = await ProjectCRUD.update_onboarding_form(
-            db=db, 
-            form_id=db_form.id, 
-            form_data={
-                "extracted_data": extracted_data,
-                "processing_status": "completed"
-            }
-        )
+    await db.commit()
     
     # Index data for RAG
     combined_data = {**parsed_form_data}
@@ -142,39 +162,22 @@ async def create_onboarding_form(
 
 @router.get("/{project_id}/onboarding", response_model=List[OnboardingForm])
 async def read_onboarding_forms(
-    project_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(current_active_user)
+    db_project: ProjectModel = Depends(owned_project(load_forms=True, db_dependency=get_read_db)),
 ):
-    # Check if project exists and belongs to user
-    db_project = await ProjectCRUD.get(db=db, project_id=project_id)
-    if db_project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
-    if db_project.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this project")
-    
-    return await ProjectCRUD.get_onboarding_forms_by_project(db=db, project_id=project_id)
+    return db_project.onboarding_forms
 
 # Proposal endpoints
 @router.post("/{project_id}/proposals", response_model=Proposal)
 async def create_proposal(
     project_id: int,
+    db_project: ProjectModel = Depends(owned_project(load_forms=True)),
     db: Session = Depends(get_db),
-    current_user: User = Depends(current_active_user)
 ):
-    # Check if project exists and belongs to user
-    db_project = await ProjectCRUD.get(db=db, project_id=project_id)
-    if db_project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
-    if db_project.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this project")
-    
-    # Get the latest onboarding form
-    forms = await ProjectCRUD.get_onboarding_forms_by_project(db=db, project_id=project_id)
+    forms = db_project.onboarding_forms
     if not forms:
         raise HTTPException(status_code=400, detail="No onboarding form found for this project")
     
-    latest_form = forms[-1]  # Assuming forms are returned in chronological order
+    latest_form = max(forms, key=lambda form: form.id)
     
     # Generate proposal using AI
     form_data = latest_form.form_data
@@ -189,22 +192,29 @@ async def create_proposal(
         content=proposal_content
     )
     
-    return await ProjectCRUD.create_proposal(db=db, proposal=proposal_create)
+    db_proposal = await ProjectCRUD.create_proposal(db=db, proposal=proposal_create)
+    await db.commit()
+    return db_proposal
 
 @router.get("/{project_id}/proposals", response_model=List[Proposal])
 async def read_proposals(
+    db_project: ProjectModel = Depends(owned_project(load_proposals=True, db_dependency=get_read_db)),
+):
+    return sorted(db_project.proposals, key=lambda proposal: proposal.version, reverse=True)
+
+@router.get("/{project_id}/proposals/versions", response_model=List[ProposalVersion])
+async def read_proposal_versions(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(current_active_user)
 ):
-    # Check if project exists and belongs to user
-    db_project = await ProjectCRUD.get(db=db, project_id=project_id)
-    if db_project is None:
+    """Proposal version history, newest first, without the content"""
+    versions = await ProjectCRUD.get_proposal_versions_for_user(
+        db=db, project_id=project_id, user_id=current_user.id
+    )
+    if versions is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    if db_project.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this project")
-    
-    return await ProjectCRUD.get_proposals_by_project(db=db, project_id=project_id)
+    return versions
 
 @router.put("/{project_id}/proposals/{proposal_id}", response_model=Proposal)
 async def update_proposal(
@@ -214,18 +224,13 @@ async def update_proposal(
     db: Session = Depends(get_db),
     current_user: User = Depends(current_active_user)
 ):
-    # Check if project exists and belongs to user
-    db_project = await ProjectCRUD.get(db=db, project_id=project_id)
-    if db_project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
-    if db_project.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this project")
-    
-    # Check if proposal exists and belongs to project
-    db_proposal = await ProjectCRUD.get_proposal(db=db, proposal_id=proposal_id)
+    # Proposal, project membership and ownership are checked in one query
+    db_proposal = await ProjectCRUD.get_proposal_for_user(
+        db=db, project_id=project_id, proposal_id=proposal_id, user_id=current_user.id
+    )
     if db_proposal is None:
         raise HTTPException(status_code=404, detail="Proposal not found")
-    if db_proposal.project_id != project_id:
-        raise HTTPException(status_code=400, detail="Proposal does not belong to this project")
     
-    return await ProjectCRUD.update_proposal(db=db, proposal_id=proposal_id, content=content)
\ No newline at end of file
+    db_proposal = await ProjectCRUD.update_proposal(db=db, db_proposal=db_proposal, content=content)
+    await db.commit()
+    return db_proposal
\ No newline at end of file
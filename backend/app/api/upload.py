@@ -10,6 +10,7 @@ from fastapi.responses import JSONResponse
 import aiofiles
 
 from app.core.config import settings
+from app.core.metrics import timed
 from app.models.user import User
 from app.api.users import current_active_user, is_admin
 
@@ -55,9 +56,10 @@ async def upload_file(
     
     # Save file
     try:
-        async with aiofiles.open(file_path, 'wb') as out_file:
-            content = await file.read()
-            await out_file.write(content)
+        with timed("io"):
+            async with aiofiles.open(file_path, 'wb') as out_file:
+                content = await file.read()
+                await out_file.write(content)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
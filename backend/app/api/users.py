@@ -2,27 +2,75 @@
 User authentication API using fastapi-users.
 """
 
-from typing import Optional, Union
+import time
+from typing import Any, Dict, Optional, Union
 
+import jwt
 from fastapi import Depends, Request, HTTPException, status
-from fastapi_users import BaseUserManager, FastAPIUsers, IntegerIDMixin
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import BaseUserManager, FastAPIUsers, IntegerIDMixin, exceptions, schemas
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
     JWTStrategy,
 )
 from fastapi_users.db import SQLAlchemyUserDatabase
+from fastapi_users.jwt import decode_jwt
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.core.db import get_db
+from app.core.db import async_session_factory, get_db
+from app.core.security import password_helper, password_pool
 from app.models.user import User
 
 
+# Detached user snapshots by id, and user ids by raw JWT
+user_cache: TTLCache[User] = TTLCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
+token_cache: TTLCache[str] = TTLCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+
+def _snapshot(user: User) -> User:
+    """Copy a loaded user into a detached instance safe to share between requests."""
+    copy = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+class CachedUserDatabase(SQLAlchemyUserDatabase):
+    """User adapter that serves lookups by id from ``user_cache``.
+
+    A cache hit is merged into the request's session without a SELECT, so
+    each request still works on its own session-bound instance. Every
+    update (profile, password, deactivation) and delete evicts the user.
+    """
+
+    async def get(self, id: Any) -> Optional[User]:
+        cached = user_cache.get(id)
+        if cached is not None:
+            return await self.session.merge(cached, load=False)
+        user = await super().get(id)
+        if user is not None:
+            user_cache.set(id, _snapshot(user))
+        return user
+
+    async def update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        user_cache.pop(user.id)
+        user = await super().update(user, update_dict)
+        user_cache.pop(user.id)
+        return user
+
+    async def delete(self, user: User) -> None:
+        user_cache.pop(user.id)
+        await super().delete(user)
+
+
 # User database adapter
 async def get_user_db(session: AsyncSession = Depends(get_db)):
     """Get user database adapter."""
-    yield SQLAlchemyUserDatabase(session, User)
+    yield CachedUserDatabase(session, User)
 
 
 # User manager for handling user operations
@@ -32,6 +80,58 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     reset_password_token_secret = settings.SECRET_KEY
     verification_token_secret = settings.SECRET_KEY
     
+    # The base class hashes inline on the event loop; the overrides below
+    # route login, registration and password changes through password_pool.
+    
+    async def create(
+        self, user_create: schemas.UC, safe: bool = False, request: Optional[Request] = None
+    ) -> User:
+        """Create a user, hashing the password on the hashing pool."""
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await password_pool.hash(password)
+
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+    
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> Optional[User]:
+        """Verify credentials on the hashing pool, upgrading outdated hashes."""
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Still pay for a hash so unknown emails can't be told apart by timing
+            await password_pool.hash(credentials.password)
+            return None
+
+        verified, updated_password_hash = await password_pool.verify_and_update(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+        return user
+    
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        """Hash a new password on the hashing pool before the regular update."""
+        password = update_dict.get("password")
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {key: value for key, value in update_dict.items() if key != "password"}
+            update_dict["hashed_password"] = await password_pool.hash(password)
+        return await super()._update(user, update_dict)
+    
     async def on_after_register(self, user: User, request: Optional[Request] = None):
         """Hook that is called after a user is registered."""
         print(f"User {user.id} has registered.")
@@ -52,17 +152,47 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
 # Get user manager
 async def get_user_manager(user_db=Depends(get_user_db)):
     """Get user manager."""
-    yield UserManager(user_db)
+    yield UserManager(user_db, password_helper)
 
 
 # Bearer transport for JWT
 bearer_transport = BearerTransport(tokenUrl=f"{settings.API_V1_STR}/auth/jwt/login")
 
 
+class CachedJWTStrategy(JWTStrategy):
+    """JWT strategy that remembers each token's decoded user id.
+
+    Entries never outlive the token's own ``exp`` claim.
+    """
+
+    async def read_token(self, token: Optional[str], user_manager: BaseUserManager) -> Optional[User]:
+        if token is None:
+            return None
+
+        user_id = token_cache.get(token)
+        if user_id is None:
+            try:
+                data = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+            except jwt.PyJWTError:
+                return None
+            user_id = data.get("sub")
+            if user_id is None:
+                return None
+            if "exp" in data:
+                token_cache.set(token, user_id, ttl=data["exp"] - time.time())
+            else:
+                token_cache.set(token, user_id)
+
+        try:
+            return await user_manager.get(user_manager.parse_id(user_id))
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+
+
 # JWT strategy for authentication
 def get_jwt_strategy() -> JWTStrategy:
     """Get JWT strategy."""
-    return JWTStrategy(
+    return CachedJWTStrategy(
         secret=settings.SECRET_KEY,
         lifetime_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
     )
@@ -85,6 +215,18 @@ current_active_user = fastapi_users.current_user(active=True)
 current_superuser = fastapi_users.current_user(active=True, superuser=True)
 
 
+# For middleware, which runs outside FastAPI's dependency injection
+async def is_superuser_token(authorization: Optional[str]) -> bool:
+    """Whether a raw Authorization header carries an active superuser's token."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    async with async_session_factory() as session:
+        user_manager = UserManager(CachedUserDatabase(session, User), password_helper)
+        user = await get_jwt_strategy().read_token(token, user_manager)
+    return user is not None and user.is_active and user.is_superuser
+
+
 # Optional current user dependency - for endpoints that work with or without authentication
 async def optional_current_user(request: Request):
     """
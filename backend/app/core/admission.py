@@ -0,0 +1,227 @@
+"""
+Admission control and load shedding for anonymous endpoints.
+"""
+
+import json
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from starlette.exceptions import HTTPException
+
+from app.core.config import settings
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, up to ``burst``."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take one token; returns 0 on success or seconds until one is available"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionRule:
+    """An anonymous route guarded by per-IP and per-route rate limits."""
+
+    def __init__(self, name: str, method: str, path_prefix: str):
+        self.name = name
+        self.method = method
+        self.path_prefix = path_prefix
+
+    def matches(self, method: str, path: str) -> bool:
+        return method == self.method and path.startswith(self.path_prefix)
+
+
+def default_rules() -> List[AdmissionRule]:
+    api = settings.API_V1_STR
+    return [
+        AdmissionRule("create_lead", "POST", f"{api}/leads"),
+        AdmissionRule("public_blogs", "GET", f"{api}/blogs/public"),
+        AdmissionRule("register", "POST", f"{api}/auth/register"),
+    ]
+
+
+class BodyTooLarge(HTTPException):
+    """Raised from ``receive`` so FastAPI answers 413 while reading the body."""
+
+    def __init__(self):
+        super().__init__(status_code=413, detail="Request body too large")
+
+
+class AdmissionStats:
+    """Counters exported for dashboards."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.anonymous_in_flight = 0
+        self.admitted: Dict[str, int] = defaultdict(int)
+        self.rejected: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def as_dict(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "anonymous_in_flight": self.anonymous_in_flight,
+            "admitted": dict(self.admitted),
+            "rejected": [
+                {"route": route, "reason": reason, "count": count}
+                for (route, reason), count in sorted(self.rejected.items())
+            ],
+        }
+
+
+admission_stats = AdmissionStats()
+
+
+class AdmissionControlMiddleware:
+    """Sheds excess load before a request reaches a handler (and a DB session).
+
+    Every request counts against ADMISSION_MAX_IN_FLIGHT; anonymous routes also
+    count against the lower ADMISSION_ANONYMOUS_MAX_IN_FLIGHT so a flood on them
+    cannot take the whole connection pool from authenticated users. Over
+    either limit the request gets an immediate 503. Anonymous routes are
+    additionally token-bucket limited per client IP and per route (429) and
+    capped in request body size (413).
+    """
+
+    def __init__(self, app, rules: Optional[List[AdmissionRule]] = None, stats: AdmissionStats = admission_stats):
+        self.app = app
+        self.rules = rules if rules is not None else default_rules()
+        self.stats = stats
+        self.ip_buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self.route_buckets: Dict[str, TokenBucket] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rule = next((r for r in self.rules if r.matches(scope["method"], scope["path"])), None)
+        route = rule.name if rule else "other"
+
+        if self.stats.in_flight >= settings.ADMISSION_MAX_IN_FLIGHT:
+            await self._reject(send, route, "overloaded", 503, "Server is busy, please retry", retry_after=1)
+            return
+
+        if rule is not None:
+            if self.stats.anonymous_in_flight >= settings.ADMISSION_ANONYMOUS_MAX_IN_FLIGHT:
+                await self._reject(send, route, "overloaded", 503, "Server is busy, please retry", retry_after=1)
+                return
+
+            retry_after = self._check_rate(rule, self._client_ip(scope))
+            if retry_after:
+                await self._reject(send, route, "rate_limited", 429, "Too many requests", retry_after=retry_after)
+                return
+
+            content_length = self._content_length(scope)
+            if content_length is not None and content_length > settings.ADMISSION_MAX_BODY_BYTES:
+                await self._reject(send, route, "body_too_large", 413, "Request body too large")
+                return
+            receive = self._limit_body(receive, route)
+
+        self.stats.in_flight += 1
+        if rule is not None:
+            self.stats.anonymous_in_flight += 1
+        self.stats.admitted[route] += 1
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BodyTooLarge as e:
+            if response_started:
+                raise
+            await self._respond(send, e.status_code, e.detail)
+        finally:
+            self.stats.in_flight -= 1
+            if rule is not None:
+                self.stats.anonymous_in_flight -= 1
+
+    def _check_rate(self, rule: AdmissionRule, ip: str) -> float:
+        now = time.monotonic()
+
+        key = (rule.name, ip)
+        bucket = self.ip_buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(settings.ADMISSION_IP_RATE, settings.ADMISSION_IP_BURST, now)
+            self.ip_buckets[key] = bucket
+            if len(self.ip_buckets) > settings.ADMISSION_MAX_TRACKED_CLIENTS:
+                self.ip_buckets.popitem(last=False)
+        else:
+            self.ip_buckets.move_to_end(key)
+        retry_after = bucket.take(now)
+        if retry_after:
+            return retry_after
+
+        bucket = self.route_buckets.get(rule.name)
+        if bucket is None:
+            bucket = TokenBucket(settings.ADMISSION_ROUTE_RATE, settings.ADMISSION_ROUTE_BURST, now)
+            self.route_buckets[rule.name] = bucket
+        return bucket.take(now)
+
+    @staticmethod
+    def _client_ip(scope) -> str:
+        # Never X-Forwarded-For directly: clients set it themselves. Uvicorn's
+        # proxy-headers support rewrites ``client`` for trusted proxies only.
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    def _content_length(scope) -> Optional[int]:
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+    def _limit_body(self, receive, route: str):
+        """Enforce the body cap on chunked uploads that declare no length"""
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > settings.ADMISSION_MAX_BODY_BYTES:
+                    self.stats.rejected[(route, "body_too_large")] += 1
+                    raise BodyTooLarge()
+            return message
+
+        return limited_receive
+
+    async def _reject(self, send, route: str, reason: str, status_code: int, detail: str, retry_after: float = 0):
+        self.stats.rejected[(route, reason)] += 1
+        await self._respond(send, status_code, detail, retry_after)
+
+    @staticmethod
+    async def _respond(send, status_code: int, detail: str, retry_after: float = 0):
+        body = json.dumps({"detail": detail}).encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ]
+        if retry_after:
+            headers.append((b"retry-after", str(max(1, round(retry_after))).encode("latin-1")))
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -2,7 +2,7 @@
 Application configuration settings.
 """ 
 
-from typing import List, Union
+from typing import List, Optional, Union
 from pydantic import AnyHttpUrl, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -26,15 +26,127 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Optional read replicas (JSON list of URLs) serving safe GET endpoints.
+    # A replica is taken out of rotation while its health check fails or it
+    # lags the primary by more than REPLICA_MAX_LAG_SECONDS.
+    DATABASE_REPLICA_URLS: List[str] = []
+    REPLICA_HEALTH_CHECK_INTERVAL_SECONDS: float = 10.0
+    REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS: float = 2.0
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+
+    # Connection pool, per engine (primary and each replica). Idle connections
+    # are pinged every DB_POOL_LIVENESS_INTERVAL_SECONDS (0 disables) rather
+    # than on every checkout; DB_POOL_PRE_PING restores the per-checkout ping.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 3600
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_LIVENESS_INTERVAL_SECONDS: float = 30.0
+    # Behind PgBouncer in transaction mode: no client-side pool (NullPool)
+    # and no asyncpg prepared statement caching
+    DB_PGBOUNCER_MODE: bool = False
+    # GET handlers run in READ ONLY transactions; DEFERRABLE additionally
+    # avoids serialization failures when the server runs at SERIALIZABLE
+    DB_READ_ONLY_DEFERRABLE: bool = False
     
     # Security
     SECRET_KEY: str
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Per-process cache of authenticated users and decoded tokens. Changes
+    # made through another worker become visible after at most the TTL.
+    USER_CACHE_TTL_SECONDS: float = 30.0
+    USER_CACHE_MAX_SIZE: int = 10_000
+
+    # Password hashing. Changing the algorithm or work factors re-hashes each
+    # user's password transparently on their next login.
+    PASSWORD_HASH_ALGORITHM: str = "bcrypt"  # bcrypt | argon2
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Proposal versions are stored as compressed deltas with a full copy
+    # every PROPOSAL_CHECKPOINT_INTERVAL versions
+    PROPOSAL_CHECKPOINT_INTERVAL: int = 10
+    PROPOSAL_CACHE_SIZE: int = 256
 
     # Google API Key
     GOOGLE_API_KEY: str
 
+    # Markdown rendering (blog posts and proposals)
+    MARKDOWN_RENDER_WORKERS: int = 2
+    MARKDOWN_RENDER_CACHE_SIZE: int = 512
+
+    # Public lead intake: opt-in write-behind batching with email dedup
+    LEAD_BATCH_WRITES: bool = False
+    LEAD_BATCH_MAX_DELAY_MS: int = 20
+    LEAD_BATCH_MAX_SIZE: int = 100
+    LEAD_DEDUP_WINDOW_SECONDS: int = 600
+
+    # Leads the database cannot take within the timeout are spooled to disk
+    LEAD_WRITE_TIMEOUT_SECONDS: float = 5.0
+    LEAD_SPOOL_PATH: str = "spool/leads.jsonl"
+    LEAD_SPOOL_REPLAY_INTERVAL_SECONDS: float = 5.0
+
+    # Prometheus metrics at /metrics and a Server-Timing header on every
+    # response. /metrics requires METRICS_TOKEN as a bearer token and answers
+    # 404 while no token is set.
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None
+    SERVER_TIMING_ENABLED: bool = True
+
+    # Print statements slower than the threshold, and statement shapes a
+    # single request repeats at least N_PLUS_ONE_THRESHOLD times
+    QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    N_PLUS_ONE_THRESHOLD: int = 5
+
+    # Opt-in watchdog that prints the stack and route of any callback step
+    # holding the event loop longer than the threshold
+    LOOP_WATCHDOG_ENABLED: bool = False
+    LOOP_WATCHDOG_THRESHOLD_MS: float = 100.0
+
+    # Sampling profiler: superusers profile a request with `X-Profile: 1`;
+    # PROFILE_SAMPLE_RATE of all other traffic is profiled as well. Profiles
+    # go to PROFILE_DIR (collapsed stacks), newest PROFILE_MAX_FILES kept.
+    PROFILING_ENABLED: bool = True
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_FILES: int = 200
+
+    # Admission control: global and anonymous in-flight caps, plus token
+    # buckets (tokens/second, burst) per client IP and per anonymous route.
+    # Keep the anonymous cap below the DB pool size (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+    # The client IP is the ASGI client address. Behind a load balancer, start
+    # uvicorn with FORWARDED_ALLOW_IPS (or --forwarded-allow-ips) set to the
+    # proxies' addresses so it fills that in from X-Forwarded-For; otherwise
+    # every client shares the proxy's bucket.
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 200
+    ADMISSION_ANONYMOUS_MAX_IN_FLIGHT: int = 15
+    ADMISSION_IP_RATE: float = 1.0
+    ADMISSION_IP_BURST: int = 10
+    ADMISSION_ROUTE_RATE: float = 50.0
+    ADMISSION_ROUTE_BURST: int = 100
+    ADMISSION_MAX_BODY_BYTES: int = 64 * 1024
+    ADMISSION_MAX_TRACKED_CLIENTS: int = 100_000
+
+    # Lead analytics rollups. Leads younger than the settle time are left for
+    # the next run so late-committing inserts are not skipped by the watermark.
+    LEAD_ROLLUP_INTERVAL_SECONDS: float = 60.0
+    LEAD_ROLLUP_SETTLE_SECONDS: float = 10.0
+
+    # Background AI scoring of new leads, many leads per prompt
+    LEAD_SCORING_ENABLED: bool = True
+    LEAD_SCORING_INTERVAL_SECONDS: float = 30.0
+    LEAD_SCORING_BATCH_SIZE: int = 20
+    LEAD_SCORING_MAX_ATTEMPTS: int = 3
+
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
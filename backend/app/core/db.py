@@ -1,35 +1,60 @@
 """
 Database connection and configuration.
-""" 
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import event, make_url, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.core.query_log import instrument_queries
+from app.core.pool import InstrumentedQueuePool, PoolLivenessChecker, instrument
+
+
+def create_engine_for(url: str) -> AsyncEngine:
+    # Handle the sslmode parameter for asyncpg
+    # For asyncpg, we need to convert sslmode=require to ssl=True
+    connect_args = {}
+    if "sslmode=require" in url:
+        # Remove sslmode from URL
+        url = url.replace("?sslmode=require", "")
+        # Add SSL configuration
+        connect_args["ssl"] = True
+
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer hands each transaction whichever server connection is free,
+        # so neither pooled connections nor named prepared statements carry over
+        url = make_url(url)
+        if url.get_driver_name() == "asyncpg":
+            url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+        return create_async_engine(url, echo=False, connect_args=connect_args, poolclass=NullPool)
+
+    return instrument(create_async_engine(
+        url,
+        echo=False,
+        connect_args=connect_args,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    ))
+
 
 # Create async engine with SSL configuration
-# Handle the sslmode parameter for asyncpg
-db_url = settings.DATABASE_URL
-
-# For asyncpg, we need to convert sslmode=require to ssl=True
-connect_args = {}
-if "sslmode=require" in db_url:
-    # Remove sslmode from URL
-    db_url = db_url.replace("?sslmode=require", "")
-    # Add SSL configuration
-    connect_args["ssl"] = True
-
-# Create async engine with improved connection parameters
-engine = create_async_engine(
-    db_url, 
-    echo=False,
-    connect_args=connect_args,
-    pool_pre_ping=True,  # Check connection validity before using it
-    pool_recycle=3600,   # Recycle connections after 1 hour
-    pool_size=20,        # Increase pool size
-    max_overflow=10      # Allow 10 connections beyond pool_size
-)
+engine = create_engine_for(settings.DATABASE_URL)
+instrument_engine(engine, "primary")
+if settings.QUERY_LOG_ENABLED:
+    instrument_queries(engine)
 
 # Create async session factory
 async_session_factory = sessionmaker(
@@ -40,6 +65,173 @@ async_session_factory = sessionmaker(
 Base = declarative_base()
 
 
+def read_only_engine(async_engine: AsyncEngine) -> AsyncEngine:
+    """The same engine and pool, with transactions opened as BEGIN READ ONLY"""
+    if async_engine.dialect.name != "postgresql":
+        return async_engine
+    return async_engine.execution_options(
+        postgresql_readonly=True,
+        postgresql_deferrable=settings.DB_READ_ONLY_DEFERRABLE,
+    )
+
+
+# Seconds a replica is behind the primary; 0 when it has replayed everything it received
+REPLICATION_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class ReplicaSet:
+    """Read replicas used round-robin, with a background health check.
+
+    A replica leaves the rotation while it is unreachable or lags the primary
+    by more than ``max_lag`` seconds. With no healthy replica, reads go to
+    the primary.
+    """
+
+    def __init__(self, urls: List[str], check_interval: float, check_timeout: float, max_lag: float):
+        self.engines = [create_engine_for(url) for url in urls]
+        for replica in self.engines:
+            instrument_engine(replica, "replica")
+            if settings.QUERY_LOG_ENABLED:
+                instrument_queries(replica)
+        self.read_only_engines = {replica: read_only_engine(replica) for replica in self.engines}
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.max_lag = max_lag
+        self.healthy: List[AsyncEngine] = list(self.engines)
+        self.errors: Dict[str, str] = {}
+        self.lag: Dict[str, float] = {}
+        self._next = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _name(replica: AsyncEngine) -> str:
+        return replica.url.render_as_string(hide_password=True)
+
+    def choose(self) -> Optional[AsyncEngine]:
+        healthy = self.healthy
+        if not healthy:
+            return None
+        self._next = (self._next + 1) % len(healthy)
+        return healthy[self._next]
+
+    async def _check_one(self, replica: AsyncEngine) -> float:
+        async with replica.connect() as conn:
+            if replica.dialect.name != "postgresql":
+                await conn.execute(text("SELECT 1"))
+                return 0.0
+            return float((await conn.execute(text(REPLICATION_LAG_SQL))).scalar_one())
+
+    async def check(self) -> None:
+        healthy = []
+        for replica in self.engines:
+            name = self._name(replica)
+            try:
+                lag = await asyncio.wait_for(self._check_one(replica), self.check_timeout)
+                self.lag[name] = lag
+                if lag > self.max_lag:
+                    raise RuntimeError(f"replication lag {lag:.1f}s exceeds {self.max_lag:.1f}s")
+                self.errors.pop(name, None)
+                healthy.append(replica)
+            except Exception as e:
+                self.errors[name] = str(e) or type(e).__name__
+        self.healthy = healthy
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Replica health check failed: {e}")
+            await asyncio.sleep(self.check_interval)
+
+    async def start(self) -> None:
+        if self.engines and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.engines:
+            await replica.dispose()
+
+    def stats(self) -> List[dict]:
+        healthy = {id(replica) for replica in self.healthy}
+        return [
+            {
+                "replica": self._name(replica),
+                "healthy": id(replica) in healthy,
+                "lag_seconds": self.lag.get(self._name(replica)),
+                "error": self.errors.get(self._name(replica)),
+            }
+            for replica in self.engines
+        ]
+
+
+replicas = ReplicaSet(
+    urls=settings.DATABASE_REPLICA_URLS,
+    check_interval=settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS,
+    check_timeout=settings.REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+)
+
+
+pool_liveness = PoolLivenessChecker(interval=settings.DB_POOL_LIVENESS_INTERVAL_SECONDS)
+
+
+class ReadOnlySessionError(Exception):
+    pass
+
+
+class ReadOnlySession(Session):
+    """Session for safe GET handlers, reading from one replica or the primary.
+
+    Transactions start as BEGIN READ ONLY on PostgreSQL and are never
+    committed; closing the session rolls back. Flushes and INSERT, UPDATE or
+    DELETE statements raise ReadOnlySessionError before reaching the database.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.target: Optional[AsyncEngine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.target is None:
+            replica = replicas.choose()
+            self.target = replicas.read_only_engines[replica] if replica is not None else read_only_primary
+        return self.target.sync_engine
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _reject_flush(session, flush_context, instances):
+    raise ReadOnlySessionError("Cannot flush a read-only session; use get_db for handlers that write")
+
+
+@event.listens_for(ReadOnlySession, "do_orm_execute")
+def _reject_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        raise ReadOnlySessionError("Cannot write through a read-only session; use get_db for handlers that write")
+
+
+read_only_primary = read_only_engine(engine)
+
+read_session_factory = sessionmaker(
+    engine, class_=AsyncSession, sync_session_class=ReadOnlySession, expire_on_commit=False
+)
+
+
 async def get_db():
     """Dependency for getting async DB session."""
     async with async_session_factory() as session:
@@ -50,5 +242,15 @@ async def get_db():
             await session.rollback()
             raise
         finally:
-            await session.close() 
+            await session.close()
+
+
+def new_read_session() -> AsyncSession:
+    """Read-only session, routed to a replica when one is healthy."""
+    return read_session_factory()
+
 
+async def get_read_db():
+    """Dependency for safe GET handlers: a read-only session that is never committed."""
+    async with new_read_session() as session:
+        yield session
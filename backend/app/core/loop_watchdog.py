@@ -0,0 +1,123 @@
+"""
+Event-loop blocking watchdog.
+
+A heartbeat task on the event loop records when it last ran; a watchdog
+thread notices when the heartbeat is late by more than the threshold, which
+means a single callback step is holding the loop. It then captures the loop
+thread's stack and the route of the task that is running, and reports the
+block once the loop is free again. Opt-in via LOOP_WATCHDOG_ENABLED; meant
+for staging, where it catches synchronous I/O slipping into async handlers.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram, route_template
+
+# Innermost frames of the blocked stack to print
+STACK_DEPTH = 20
+
+loop_lag = Histogram(
+    "event_loop_lag_seconds", "Heartbeat lateness of the event loop",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+loop_blocks = Counter("event_loop_blocks_total", "Callback steps that blocked the event loop", ["route"])
+
+
+class LoopWatchdog:
+    """Reports event-loop stalls longer than ``threshold`` seconds."""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.interval = max(threshold / 4, 0.005)
+        # Scope of the request each task serves, for attribution
+        self.task_scopes: Dict[asyncio.Task, dict] = {}
+        self.blocks = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            loop_lag.observe(value=max(time.monotonic() - expected, 0.0))
+
+    def _route_of_running_task(self) -> str:
+        task = asyncio.current_task(self._loop)
+        if task is None:
+            return "callback"
+        scope = self.task_scopes.get(task)
+        if scope is None:
+            return "background"
+        return f"{scope['method']} {route_template(scope)}"
+
+    def _watch(self) -> None:
+        blocked_since = None
+        route, stack = "", ""
+        while not self._stopping.wait(self.interval):
+            stalled = time.monotonic() - self._last_beat - self.interval
+            if stalled > self.threshold and blocked_since is None:
+                blocked_since = self._last_beat + self.interval
+                route = self._route_of_running_task()
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stack = "".join(traceback.format_stack(frame, limit=STACK_DEPTH)) if frame is not None else ""
+            elif stalled <= self.threshold and blocked_since is not None:
+                duration = self._last_beat - blocked_since
+                self.blocks += 1
+                loop_blocks.inc(route.split(" ", 1)[-1])
+                print(f"Event loop blocked for {duration * 1000:.0f} ms in {route}:\n{stack}")
+                blocked_since = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._thread.join()
+        self._thread = None
+
+
+loop_watchdog = LoopWatchdog(threshold=settings.LOOP_WATCHDOG_THRESHOLD_MS / 1000)
+
+
+class LoopWatchdogMiddleware:
+    """Lets the watchdog attribute a stall to the request being served."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        task = asyncio.current_task()
+        if scope["type"] != "http" or task is None:
+            return await self.app(scope, receive, send)
+        loop_watchdog.task_scopes[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            loop_watchdog.task_scopes.pop(task, None)
@@ -0,0 +1,241 @@
+"""
+Prometheus metrics and per-request Server-Timing.
+
+Metrics live in process memory and are rendered in the Prometheus text
+format by ``GET /metrics``; with several workers, each one reports its own.
+Time spent in the database, the LLM and file I/O is also added up per request
+and returned in a ``Server-Timing`` header, with the remainder as ``app``.
+"""
+
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+# Server-Timing categories, in header order
+TIMING_CATEGORIES = ("db", "ai", "io")
+
+DB_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK"}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        registry.append(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self.values: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] += amount
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] -= amount
+
+    def set(self, *labels: str, value: float) -> None:
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum
+        self.values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, *labels: str, value: float) -> None:
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total[0])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+registry: List[Metric] = []
+# Called before each scrape to refresh gauges that mirror other components' stats
+collectors: List[Callable[[], None]] = []
+
+http_requests = Counter("http_requests_total", "HTTP requests by route and status", ["method", "route", "status"])
+http_latency = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+# By method only: the route is not known until routing has run
+http_in_flight = Gauge("http_requests_in_flight", "HTTP requests being handled", ["method"])
+db_queries = Counter("db_queries_total", "Database statements executed", ["database", "operation"])
+db_latency = Histogram("db_query_duration_seconds", "Database statement latency", ["database", "operation"])
+llm_requests = Counter("llm_requests_total", "Upstream LLM calls", ["model", "outcome"])
+llm_latency = Histogram("llm_request_duration_seconds", "Upstream LLM call latency", ["model"], LLM_BUCKETS)
+
+
+def render() -> str:
+    for collect in collectors:
+        collect()
+    lines: List[str] = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Seconds per Server-Timing category for the current request, if any
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def add_timing(category: str, seconds: float) -> None:
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[category] = timings.get(category, 0.0) + seconds
+
+
+@contextmanager
+def timed(category: str) -> Iterator[None]:
+    """Count the enclosed block (sync or awaiting) towards a Server-Timing category"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(category, time.perf_counter() - start)
+
+
+def instrument_engine(engine: AsyncEngine, database: str) -> None:
+    """Time every statement the engine executes"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        words = statement.split(None, 1)
+        operation = words[0].upper() if words and words[0].upper() in DB_OPERATIONS else "OTHER"
+        db_queries.inc(database, operation)
+        db_latency.observe(database, operation, value=elapsed)
+        add_timing("db", elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+
+def route_template(scope) -> str:
+    """Path template of the matched route, which keeps label cardinality bounded"""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    regex = getattr(route, "path_regex", None)
+    if template is None or regex is None:
+        return "unmatched"
+    # Routes of included routers may carry their path relative to the
+    # router prefix; recover the (static) prefix from the request path
+    path = scope["path"]
+    for i, char in enumerate(path):
+        if char == "/" and regex.match(path[i:]):
+            return path[:i] + template
+    return template
+
+
+class MetricsMiddleware:
+    """Records request metrics and sets the Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+        http_in_flight.inc(method)
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    total = time.perf_counter() - start
+                    parts = [f"{name};dur={timings.get(name, 0.0) * 1000:.1f}" for name in TIMING_CATEGORIES]
+                    app_time = max(total - sum(timings.get(name, 0.0) for name in TIMING_CATEGORIES), 0.0)
+                    parts.append(f"app;dur={app_time * 1000:.1f}")
+                    parts.append(f"total;dur={total * 1000:.1f}")
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", ", ".join(parts).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = route_template(scope)
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec(method)
+            http_requests.inc(method, route, str(status))
+            http_latency.observe(method, route, value=elapsed)
+            _request_timings.reset(token)
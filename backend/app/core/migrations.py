@@ -0,0 +1,176 @@
+"""
+Versioned schema migrations.
+
+Migrations are the ``NNNN_name.sql`` files in ``backend/migrations``, applied
+in order and recorded in the ``schema_migrations`` table:
+
+    python -m app.core.migrations            # apply pending migrations
+    python -m app.core.migrations status     # list applied and pending ones
+
+Each migration runs in its own transaction. A file whose first line is
+``-- migrate: no-transaction`` runs statement by statement outside one,
+which CREATE INDEX CONCURRENTLY requires.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from app.core.db import engine
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+NO_TRANSACTION = "-- migrate: no-transaction"
+
+# Arbitrary key for pg_advisory_lock, so concurrent deploys migrate one at a time
+LOCK_KEY = 727_001
+
+CREATE_HISTORY_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    checksum VARCHAR(64) NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+class MigrationError(Exception):
+    pass
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode("utf-8")).hexdigest()
+
+    @property
+    def transactional(self) -> bool:
+        return not self.sql.startswith(NO_TRANSACTION)
+
+    def statements(self) -> List[str]:
+        """Split on statement-ending semicolons; only for files without function bodies"""
+        statements, current = [], []
+        for line in self.sql.splitlines():
+            if line.strip().startswith("--") and not current:
+                continue
+            current.append(line)
+            if line.rstrip().endswith(";"):
+                statements.append("\n".join(current).strip())
+                current = []
+        if "".join(current).strip():
+            statements.append("\n".join(current).strip())
+        return statements
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = []
+    for path in sorted(directory.iterdir()):
+        match = MIGRATION_FILE.match(path.name)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), path.read_text()))
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise MigrationError("Duplicate migration version numbers in " + str(directory))
+    return migrations
+
+
+async def _applied(driver) -> Dict[int, str]:
+    rows = await driver.fetch("SELECT version, checksum FROM schema_migrations ORDER BY version")
+    return {row["version"]: row["checksum"] for row in rows}
+
+
+def _check_history(migrations: List[Migration], applied: Dict[int, str]) -> None:
+    known = {m.version: m for m in migrations}
+    for version, checksum in applied.items():
+        migration = known.get(version)
+        if migration is None:
+            raise MigrationError(f"Migration {version:04d} is applied but its file is missing")
+        if migration.checksum != checksum:
+            raise MigrationError(
+                f"Migration {version:04d}_{migration.name} was changed after it was applied; "
+                "add a new migration instead"
+            )
+
+
+async def _connect():
+    if engine.dialect.name != "postgresql":
+        raise MigrationError(
+            f"Migrations target PostgreSQL; {engine.dialect.name} databases are created from the models"
+        )
+    return engine.connect()
+
+
+async def upgrade() -> List[Migration]:
+    """Apply all pending migrations; returns the ones applied"""
+    migrations = load_migrations()
+    applied_now = []
+    async with await _connect() as conn:
+        # Raw asyncpg connection: migration files hold several statements each
+        driver = (await conn.get_raw_connection()).driver_connection
+        await driver.execute("SELECT pg_advisory_lock($1)", LOCK_KEY)
+        try:
+            await driver.execute(CREATE_HISTORY_TABLE)
+            applied = await _applied(driver)
+            _check_history(migrations, applied)
+
+            for migration in migrations:
+                if migration.version in applied:
+                    continue
+                print(f"Applying migration {migration.version:04d}_{migration.name}")
+                record = (
+                    "INSERT INTO schema_migrations (version, name, checksum) VALUES ($1, $2, $3)",
+                    migration.version, migration.name, migration.checksum,
+                )
+                if migration.transactional:
+                    async with driver.transaction():
+                        await driver.execute(migration.sql)
+                        await driver.execute(*record)
+                else:
+                    for statement in migration.statements():
+                        await driver.execute(statement)
+                    await driver.execute(*record)
+                applied_now.append(migration)
+        finally:
+            await driver.execute("SELECT pg_advisory_unlock($1)", LOCK_KEY)
+    return applied_now
+
+
+async def status() -> None:
+    migrations = load_migrations()
+    async with await _connect() as conn:
+        driver = (await conn.get_raw_connection()).driver_connection
+        await driver.execute(CREATE_HISTORY_TABLE)
+        applied = await _applied(driver)
+    for migration in migrations:
+        if migration.version not in applied:
+            state = "pending"
+        elif applied[migration.version] != migration.checksum:
+            state = "changed"
+        else:
+            state = "applied"
+        print(f"{migration.version:04d}_{migration.name:<32} {state}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations")
+    parser.add_argument("command", nargs="?", choices=["upgrade", "status"], default="upgrade")
+    args = parser.parse_args()
+    if args.command == "status":
+        asyncio.run(status())
+    else:
+        applied = asyncio.run(upgrade())
+        print(f"{len(applied)} migration(s) applied")
+
+
+if __name__ == "__main__":
+    main()
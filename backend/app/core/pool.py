@@ -0,0 +1,165 @@
+"""
+Connection pool instrumentation and timer-based liveness checks.
+"""
+
+import asyncio
+import time
+from typing import List, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+class PoolMetrics:
+    """Checkout wait times and connection churn of one pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self.timeouts = 0
+        self.invalidated = 0
+        self.liveness_checks = 0
+        self.liveness_failures = 0
+
+    def observe_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        for i, bound in enumerate(WAIT_BUCKETS):
+            if seconds <= bound:
+                self.wait_buckets[i] += 1
+                return
+        self.wait_buckets[-1] += 1
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long each checkout waited."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.observe_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        # Keep the counters when the engine is disposed and the pool rebuilt
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def instrument(engine: AsyncEngine) -> AsyncEngine:
+    """Count invalidated connections on an engine built with InstrumentedQueuePool"""
+
+    @event.listens_for(engine.sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics = getattr(engine.sync_engine.pool, "metrics", None)
+        if metrics is not None:
+            metrics.invalidated += 1
+
+    return engine
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.sync_engine.pool
+    stats = {
+        "database": engine.url.render_as_string(hide_password=True),
+        "pool": type(pool).__name__,
+    }
+    if isinstance(pool, QueuePool):
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        stats.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow_in_use": max(pool.overflow(), 0),
+            "utilization": pool.checkedout() / capacity if capacity else 0.0,
+        })
+    metrics: Optional[PoolMetrics] = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update({
+            "checkouts": metrics.checkouts,
+            "wait_seconds_avg": metrics.wait_seconds_total / metrics.checkouts if metrics.checkouts else 0.0,
+            "wait_seconds_max": metrics.wait_seconds_max,
+            "wait_buckets": {
+                **{f"le_{bound}": count for bound, count in zip(WAIT_BUCKETS, metrics.wait_buckets)},
+                "le_inf": metrics.wait_buckets[-1],
+            },
+            "timeouts": metrics.timeouts,
+            "invalidated": metrics.invalidated,
+            "liveness_checks": metrics.liveness_checks,
+            "liveness_failures": metrics.liveness_failures,
+        })
+    return stats
+
+
+class PoolLivenessChecker:
+    """Pings idle pooled connections on a timer instead of on every checkout.
+
+    Each round checks out as many connections as are idle, one at a time;
+    the pool hands them out oldest first, so every idle connection is pinged
+    without holding more than one. A dead connection is invalidated by
+    SQLAlchemy and replaced on its next checkout, off the request path.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.engines: List[AsyncEngine] = []
+        self._task: Optional[asyncio.Task] = None
+        self.last_error: Optional[str] = None
+
+    async def check(self, engine: AsyncEngine) -> None:
+        pool = engine.sync_engine.pool
+        metrics: Optional[PoolMetrics] = getattr(pool, "metrics", None)
+        for _ in range(pool.checkedin()):
+            try:
+                async with engine.connect() as conn:
+                    await conn.exec_driver_sql("SELECT 1")
+            except exc.DBAPIError as e:
+                if metrics is not None:
+                    metrics.liveness_failures += 1
+                self.last_error = str(e)
+                if not e.connection_invalidated:
+                    raise
+            if metrics is not None:
+                metrics.liveness_checks += 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            for engine in self.engines:
+                try:
+                    await self.check(engine)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.last_error = str(e)
+
+    async def start(self, engines: List[AsyncEngine]) -> None:
+        self.engines = [e for e in engines if isinstance(e.sync_engine.pool, QueuePool)]
+        if self.interval > 0 and self.engines and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,212 @@
+"""
+Per-request sampling profiler.
+
+A request is profiled when a superuser sends ``X-Profile: 1`` with it, or
+when it falls in the PROFILE_SAMPLE_RATE fraction of traffic. A sampler
+thread records the request's stack every PROFILE_INTERVAL_MS until the
+response starts. A sample is the running stack when the request's task
+holds the event loop; otherwise it is the chain of coroutines the task is
+suspended in, ending in ``[await]``. Profiles are wall-clock.
+
+Profiles are written to PROFILE_DIR in the collapsed-stack format that
+flamegraph.pl and speedscope read. Only the newest PROFILE_MAX_FILES are
+kept. An on-demand profile's file name is returned in ``X-Profile-Id``.
+"""
+
+import asyncio
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import route_template
+
+PROFILE_NAME = re.compile(r"^[\w.-]+\.folded$")
+_SITE_PACKAGES = f"{os.sep}site-packages{os.sep}"
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if _SITE_PACKAGES in filename:
+        filename = filename.split(_SITE_PACKAGES, 1)[1]
+    else:
+        filename = os.path.relpath(filename) if os.path.isabs(filename) else filename
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _thread_stack(frame) -> List[str]:
+    """Labels of a running thread's frames, outermost first, below the event loop"""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        # Handle._run is where the event loop calls into the task's step
+        if code.co_name == "_run" and code.co_filename.endswith(os.path.join("asyncio", "events.py")):
+            break
+        labels.append(_frame_label(code))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def _await_stack(coro) -> List[str]:
+    """Labels of a suspended coroutine chain, outermost first"""
+    labels = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        labels.append(_frame_label(frame.f_code))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    labels.append("[await]")
+    return labels
+
+
+class Profile:
+    """Stack samples of one request's task."""
+
+    def __init__(self, task: asyncio.Task, scope: dict):
+        self.task = task
+        self.scope = scope
+        self.samples: Counter = Counter()
+        self.started = time.time()
+
+    def name(self) -> str:
+        route = re.sub(r"[^\w]+", "_", route_template(self.scope)).strip("_") or "root"
+        return f"{int(self.started * 1000)}-{self.scope['method']}-{route}-{uuid.uuid4().hex[:8]}.folded"
+
+    def collapsed(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+
+class Sampler:
+    """Samples every active profile from one background thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.profiles: Dict[asyncio.Task, Profile] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self.profiles[profile.task] = profile
+            if self._thread is None:
+                self._loop = asyncio.get_running_loop()
+                self._loop_thread_id = threading.get_ident()
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def remove(self, profile: Profile) -> None:
+        with self._lock:
+            self.profiles.pop(profile.task, None)
+
+    def _sample(self) -> None:
+        running = asyncio.current_task(self._loop)
+        for task, profile in list(self.profiles.items()):
+            if task is running:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stack = _thread_stack(frame)
+            else:
+                stack = _await_stack(task.get_coro())
+            if stack:
+                profile.samples[tuple(stack)] += 1
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self.profiles:
+                    self._thread = None
+                    return
+                self._sample()
+
+
+sampler = Sampler(interval=settings.PROFILE_INTERVAL_MS / 1000)
+
+
+def write_profile(profile: Profile) -> str:
+    """Store the profile and drop the oldest beyond PROFILE_MAX_FILES; returns its file name"""
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = profile.name()
+    (directory / name).write_text(profile.collapsed())
+    stored = sorted(path for path in directory.iterdir() if PROFILE_NAME.match(path.name))
+    for path in stored[:-settings.PROFILE_MAX_FILES]:
+        path.unlink(missing_ok=True)
+    return name
+
+
+def list_profiles() -> List[str]:
+    directory = Path(settings.PROFILE_DIR)
+    if not directory.is_dir():
+        return []
+    return sorted((path.name for path in directory.iterdir() if PROFILE_NAME.match(path.name)), reverse=True)
+
+
+def profile_path(name: str) -> Optional[Path]:
+    if not PROFILE_NAME.match(name):
+        return None
+    path = Path(settings.PROFILE_DIR) / name
+    return path if path.is_file() else None
+
+
+class ProfilingMiddleware:
+    """Profiles superuser requests sent with ``X-Profile: 1`` and a sample of the rest.
+
+    ``authorize`` receives the raw Authorization header and tells whether it
+    belongs to a superuser; it is only called for requests asking to be profiled.
+    """
+
+    def __init__(self, app, authorize: Callable[[Optional[str]], Awaitable[bool]]):
+        self.app = app
+        self.authorize = authorize
+
+    async def _on_demand(self, scope) -> bool:
+        headers = dict(scope["headers"])
+        if headers.get(b"x-profile") != b"1":
+            return False
+        authorization = headers.get(b"authorization")
+        return await self.authorize(authorization.decode("latin-1") if authorization else None)
+
+    async def __call__(self, scope, receive, send):
+        task = asyncio.current_task()
+        if scope["type"] != "http" or task is None:
+            return await self.app(scope, receive, send)
+
+        on_demand = await self._on_demand(scope)
+        if not on_demand and random.random() >= settings.PROFILE_SAMPLE_RATE:
+            return await self.app(scope, receive, send)
+
+        profile = Profile(task, scope)
+        sampler.add(profile)
+        finished = False
+
+        async def finish() -> Optional[str]:
+            nonlocal finished
+            if finished:
+                return None
+            finished = True
+            sampler.remove(profile)
+            return await asyncio.to_thread(write_profile, profile)
+
+        async def send_with_profile(message):
+            # The handler is done once the response starts; stop sampling there
+            if message["type"] == "http.response.start":
+                name = await finish()
+                if on_demand and name:
+                    message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", name.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            await finish()
@@ -0,0 +1,165 @@
+"""
+Slow query log and per-request N+1 detection.
+
+Every statement is timed on the engine. Statements slower than
+SLOW_QUERY_THRESHOLD_MS are printed with their parameters and the route that
+ran them. Within a request, statements are grouped by shape (the SQL with
+literals and IN lists collapsed); a shape that runs N_PLUS_ONE_THRESHOLD
+times or more is reported as a likely N+1 when the request ends.
+
+Tests can pin an endpoint's query budget with ``assert_max_queries``:
+
+    with assert_max_queries(3):
+        await client.get("/api/v1/projects/dashboard", headers=auth)
+"""
+
+import re
+import time
+from collections import Counter as ShapeCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram, route_template
+
+MAX_LOGGED_PARAMETERS = 500
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|\$\d+|%\(\w+\)s|%s|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+request_queries = Histogram(
+    "http_request_db_queries", "Database statements per request", ["route"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200),
+)
+slow_queries = Counter("db_slow_queries_total", "Statements over the slow query threshold", ["route"])
+n_plus_one = Counter("db_n_plus_one_total", "Requests that repeated one statement shape", ["route"])
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with literals, placeholder lists and whitespace normalized"""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class RequestQueries:
+    """Statements run on behalf of one HTTP request."""
+
+    __slots__ = ("scope", "count", "shapes")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.count = 0
+        self.shapes: ShapeCounter = ShapeCounter()
+
+    @property
+    def route(self) -> str:
+        return f"{self.scope['method']} {route_template(self.scope)}"
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+_current_request: ContextVar[Optional[RequestQueries]] = ContextVar("current_request_queries", default=None)
+
+
+class QueryCapture:
+    """Statements seen while an ``assert_max_queries`` block is active."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+
+# Module-level rather than a context variable so captures also see requests
+# served on another thread, as with Starlette's TestClient
+_captures: List[QueryCapture] = []
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryCapture]:
+    """Fail with the statement list if the block runs more than ``limit`` statements"""
+    capture = QueryCapture()
+    _captures.append(capture)
+    try:
+        yield capture
+    finally:
+        _captures.remove(capture)
+    if len(capture) > limit:
+        listing = "\n".join(f"  {i + 1}. {statement}" for i, statement in enumerate(capture.statements))
+        raise AssertionError(f"{len(capture)} queries executed, expected at most {limit}:\n{listing}")
+
+
+def _format_parameters(parameters) -> str:
+    text = repr(parameters)
+    if len(text) > MAX_LOGGED_PARAMETERS:
+        text = text[:MAX_LOGGED_PARAMETERS] + "..."
+    return text
+
+
+def instrument_queries(engine: AsyncEngine) -> None:
+    """Count statements per request and print the slow ones"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_log_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_log_start"].pop()
+        request = _current_request.get()
+        if request is not None:
+            request.count += 1
+            request.shapes[statement_shape(statement)] += 1
+        for capture in _captures:
+            capture.statements.append(_WHITESPACE.sub(" ", statement).strip())
+
+        if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            slow_queries.inc(route_template(request.scope) if request is not None else "background")
+            print(
+                f"Slow query ({elapsed * 1000:.0f} ms, {request.route if request is not None else 'background'}): "
+                f"{_WHITESPACE.sub(' ', statement).strip()} "
+                f"parameters={_format_parameters(parameters)}"
+            )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_log_start"):
+            conn.info["query_log_start"].pop()
+
+
+class QueryLogMiddleware:
+    """Tracks each request's statements and reports repeated shapes."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request = RequestQueries(scope)
+        token = _current_request.set(request)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_request.reset(token)
+            if request.count:
+                request_queries.observe(route_template(scope), value=request.count)
+            repeated = request.repeated(settings.N_PLUS_ONE_THRESHOLD)
+            if repeated:
+                n_plus_one.inc(route_template(scope))
+                for shape, count in repeated:
+                    print(f"Possible N+1 in {request.route}: {count}x {shape}")
@@ -0,0 +1,112 @@
+"""
+Password hashing off the event loop.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi_users.password import PasswordHelper
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+from pwdlib.hashers.bcrypt import BcryptHasher
+
+from app.core.config import settings
+
+
+def build_password_hash() -> PasswordHash:
+    """Hashers from Settings; the first one hashes, all of them verify.
+
+    Hashes made by a non-primary hasher or with different work factors are
+    reported as needing an update, which fastapi-users persists on login.
+    """
+    bcrypt_hasher = BcryptHasher(rounds=settings.BCRYPT_ROUNDS)
+    argon2_hasher = Argon2Hasher(
+        time_cost=settings.ARGON2_TIME_COST,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    )
+    if settings.PASSWORD_HASH_ALGORITHM == "argon2":
+        return PasswordHash((argon2_hasher, bcrypt_hasher))
+    return PasswordHash((bcrypt_hasher, argon2_hasher))
+
+
+class PasswordHashingPool:
+    """Runs hashing and verification on a dedicated, bounded thread pool.
+
+    bcrypt and argon2 release the GIL, so threads give real parallelism
+    without competing with the event loop. At most ``max_pending`` calls
+    may wait for a worker; beyond that callers get a 503 instead of
+    queueing without bound behind a login burst.
+    """
+
+    def __init__(self, helper: PasswordHelper, max_workers: int, max_pending: int):
+        self.helper = helper
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_seconds_total = 0.0
+        self.queue_seconds_max = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        submitted = time.perf_counter()
+
+        def timed():
+            waited = time.perf_counter() - submitted
+            self.queue_seconds_total += waited
+            self.queue_seconds_max = max(self.queue_seconds_max, waited)
+            return fn(*args)
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), timed)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.helper.hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(self.helper.verify_and_update, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_seconds_total": self.queue_seconds_total,
+            "queue_seconds_max": self.queue_seconds_max,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_helper = PasswordHelper(build_password_hash())
+password_pool = PasswordHashingPool(
+    password_helper,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,222 @@
+import html
+from typing import List, Optional, Tuple, Dict, Any
+from sqlalchemy import select, func, text, literal_column
+
+from app.models.blog import BlogPost
+from app.models.comment import BlogComment
+from app.models.user import User
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+# Private-use characters the database wraps matches in; the highlighted text
+# is HTML-escaped before they are turned into the tags above
+_MATCH_START = "\ue000"
+_MATCH_STOP = "\ue001"
+
+# Must match the configuration used by the trigger in migrations/0002_blog_search.sql
+TS_CONFIG = literal_column("'english'::regconfig")
+
+# SQLite FTS5 fallback so search can be exercised without Postgres.
+# External-content table: the index lives in blog_posts_fts, rows stay in blog_posts.
+_SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS blog_posts_fts USING fts5(
+        title, content, category, content='blog_posts', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_posts_fts_ai AFTER INSERT ON blog_posts BEGIN
+        INSERT INTO blog_posts_fts(rowid, title, content, category)
+        VALUES (new.id, new.title, new.content, new.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_posts_fts_ad AFTER DELETE ON blog_posts BEGIN
+        INSERT INTO blog_posts_fts(blog_posts_fts, rowid, title, content, category)
+        VALUES ('delete', old.id, old.title, old.content, old.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_posts_fts_au AFTER UPDATE ON blog_posts BEGIN
+        INSERT INTO blog_posts_fts(blog_posts_fts, rowid, title, content, category)
+        VALUES ('delete', old.id, old.title, old.content, old.category);
+        INSERT INTO blog_posts_fts(rowid, title, content, category)
+        VALUES (new.id, new.title, new.content, new.category);
+    END
+    """,
+    "INSERT INTO blog_posts_fts(blog_posts_fts) VALUES ('rebuild')",
+]
+
+
+async def ensure_sqlite_fts(bind) -> None:
+    """Create the SQLite search index and its triggers; a no-op on other databases.
+
+    Run at startup and by commands that build a SQLite schema, never on the
+    request path: the DDL needs SQLite's write lock.
+    """
+    if bind.dialect.name != "sqlite":
+        return
+    async with bind.begin() as conn:
+        tables = set((await conn.scalars(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('blog_posts', 'blog_posts_fts')"
+        ))).all())
+        if tables != {"blog_posts"}:
+            return
+        for statement in _SQLITE_FTS_DDL:
+            await conn.execute(text(statement))
+
+
+class BlogCRUD:
+    @staticmethod
+    async def get_posts(db, skip: int = 0, limit: Optional[int] = None) -> List[BlogPost]:
+        """Blog posts, newest first"""
+        result = await db.execute(
+            select(BlogPost).order_by(BlogPost.created_at.desc()).offset(skip).limit(limit)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_comments(db, post_id: int):
+        """A post's comments with their author's email, oldest first"""
+        result = await db.execute(
+            select(BlogComment, User.email.label("user_name"))
+            .join(User, BlogComment.user_id == User.id)
+            .filter(BlogComment.post_id == post_id)
+            .order_by(BlogComment.created_at.asc())
+        )
+        return result.all()
+
+    @staticmethod
+    async def search(db, query: str, skip: int = 0, limit: int = 20) -> Tuple[int, List[Dict[str, Any]]]:
+        """Ranked full-text search over title, category and content.
+
+        Returns the total hit count and one page of hits, best match first.
+        """
+        if db.bind.dialect.name == "sqlite":
+            rows = await BlogCRUD._search_sqlite(db, query, skip, limit)
+        else:
+            rows = await BlogCRUD._search_postgres(db, query, skip, limit)
+
+        hits = [dict(row) for row in rows]
+        for hit in hits:
+            hit["title"] = BlogCRUD._highlight_html(hit["title"])
+            hit["headline"] = BlogCRUD._highlight_html(hit["headline"])
+        if hits:
+            total = hits[0].pop("total")
+            for hit in hits[1:]:
+                del hit["total"]
+        elif skip:
+            # Paged past the end; the window count is unavailable so count separately
+            total = await BlogCRUD._count(db, query)
+        else:
+            total = 0
+        return total, hits
+
+    @staticmethod
+    async def _search_postgres(db, query: str, skip: int, limit: int):
+        tsquery = func.websearch_to_tsquery(TS_CONFIG, query)
+        rank = func.ts_rank_cd(BlogPost.search_vector, tsquery)
+
+        # Rank and page on the index first, then build headlines for the page only
+        hits = (
+            select(
+                BlogPost.id.label("id"),
+                rank.label("rank"),
+                func.count().over().label("total"),
+            )
+            .where(BlogPost.search_vector.op("@@")(tsquery))
+            .order_by(rank.desc(), BlogPost.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .subquery()
+        )
+        headline_options = (
+            f'StartSel="{_MATCH_START}", StopSel="{_MATCH_STOP}", '
+            "MaxFragments=2, MaxWords=30, MinWords=10"
+        )
+        stmt = (
+            select(
+                BlogPost.id,
+                func.ts_headline(TS_CONFIG, BlogPost.title, tsquery, headline_options).label("title"),
+                BlogPost.category,
+                BlogPost.image_url,
+                BlogPost.created_at,
+                hits.c.rank,
+                func.ts_headline(TS_CONFIG, BlogPost.content, tsquery, headline_options).label("headline"),
+                hits.c.total,
+            )
+            .join(hits, hits.c.id == BlogPost.id)
+            .order_by(hits.c.rank.desc(), BlogPost.id.desc())
+        )
+        result = await db.execute(stmt)
+        return result.mappings().all()
+
+    @staticmethod
+    async def _search_sqlite(db, query: str, skip: int, limit: int):
+        match = BlogCRUD._fts5_match(query)
+        if not match:
+            return []
+        result = await db.execute(
+            text(
+                """
+                WITH hits AS MATERIALIZED (
+                    SELECT rowid AS id,
+                           -bm25(blog_posts_fts, 10.0, 1.0, 4.0) AS rank,
+                           highlight(blog_posts_fts, 0, :start, :stop) AS title,
+                           snippet(blog_posts_fts, 1, :start, :stop, '...', 30) AS headline
+                    FROM blog_posts_fts
+                    WHERE blog_posts_fts MATCH :match
+                )
+                SELECT hits.id AS id,
+                       hits.title AS title,
+                       p.category AS category,
+                       p.image_url AS image_url,
+                       p.created_at AS created_at,
+                       hits.rank AS rank,
+                       hits.headline AS headline,
+                       count(*) OVER () AS total
+                FROM hits
+                JOIN blog_posts p ON p.id = hits.id
+                ORDER BY hits.rank DESC, hits.id DESC
+                LIMIT :limit OFFSET :skip
+                """
+            ).columns(created_at=BlogPost.created_at.type),
+            {
+                "start": _MATCH_START,
+                "stop": _MATCH_STOP,
+                "match": match,
+                "limit": limit,
+                "skip": skip,
+            },
+        )
+        return result.mappings().all()
+
+    @staticmethod
+    async def _count(db, query: str) -> int:
+        if db.bind.dialect.name == "sqlite":
+            match = BlogCRUD._fts5_match(query)
+            if not match:
+                return 0
+            result = await db.execute(
+                text("SELECT count(*) FROM blog_posts_fts WHERE blog_posts_fts MATCH :match"),
+                {"match": match},
+            )
+            return result.scalar_one()
+
+        tsquery = func.websearch_to_tsquery(TS_CONFIG, query)
+        result = await db.execute(
+            select(func.count()).select_from(BlogPost).where(BlogPost.search_vector.op("@@")(tsquery))
+        )
+        return result.scalar_one()
+
+    @staticmethod
+    def _highlight_html(text: Optional[str]) -> str:
+        """Escape post text as HTML, then mark the matches"""
+        escaped = html.escape(text or "")
+        return escaped.replace(_MATCH_START, HIGHLIGHT_START).replace(_MATCH_STOP, HIGHLIGHT_STOP)
+
+    @staticmethod
+    def _fts5_match(query: str) -> str:
+        """Quote every term so user input can never be parsed as FTS5 syntax"""
+        terms = [term.replace('"', '""') for term in query.split()]
+        return " ".join(f'"{term}"' for term in terms if term)
@@ -0,0 +1,331 @@
+"""
+Synthetic large-dataset generator for scale testing.
+
+Bulk-loads users, projects (each with an onboarding form and a proposal
+version history), blog posts with comments, and leads at configurable
+volumes, e.g.:
+
+    python -m app.db.generate --seed 1 --leads 1000000 \\
+        --posts 10 --comments-per-post 100000 \\
+        --projects 10000 --proposal-versions 50
+
+Row contents are drawn from a ``random.Random(seed)`` and timestamps count
+back from a fixed epoch, so the same arguments produce the same dataset on
+an empty database (all but the salt of the shared password hash), which
+keeps benchmarks and plan checks reproducible. Ids are assigned here,
+continuing from the current maximum of each table, and the unique keys
+(user emails, lead submission ids) derive from them, so a second run
+appends rather than collides.
+
+On PostgreSQL rows are streamed with COPY through the asyncpg connection,
+inside one transaction, and the id sequences are moved past the new rows
+(run the migrations first). Elsewhere they go in as chunked multi-row
+INSERTs; on SQLite the schema is created from the models. Proposal versions
+are stored the way ``ProjectCRUD.create_proposal`` stores them; their
+rendered HTML, like that of the posts, is left empty.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Iterable, Iterator, List, Sequence
+
+from sqlalchemy import JSON, func, insert, select, text
+
+from app.core.db import Base, async_session_factory, engine
+from app.core.security import password_helper
+from app.db.blog import ensure_sqlite_fts
+from app.models.blog import BlogPost
+from app.models.comment import BlogComment
+from app.models.lead import Lead
+from app.models.project import OnboardingForm, Project, Proposal
+from app.models.user import User
+from app.services.ai_service import AIService
+from app.services.markdown_service import content_hash
+from app.services.proposal_store import proposal_store
+
+EPOCH = datetime(2025, 1, 1)
+CHUNK_SIZE = 5000
+GENERATED_EMAIL_DOMAIN = "generated.example.com"
+GENERATED_PASSWORD = "generated-password-1"
+# Namespace for lead submission ids, which are uuid5 of the lead id
+SUBMISSION_NAMESPACE = uuid.UUID("6f1c1d2e-8a1b-4c55-9a43-5b8f0e1d7c20")
+# Share of comments that reply to an earlier comment on the same post
+REPLY_RATE = 0.3
+# Share of leads the scoring pipeline has already classified
+SCORED_RATE = 0.9
+
+WORDS = (
+    "automation workflow pipeline dashboard integration analytics onboarding "
+    "migration platform latency throughput reporting forecast inventory billing "
+    "support retention campaign pricing roadmap compliance audit security "
+    "scheduling logistics marketplace checkout search recommendation caching "
+    "replication backup monitoring alerting portal mobile api webhook export"
+).split()
+CATEGORIES = ("engineering", "product", "design", "operations", "marketing", "sales", "data", "security")
+COMPANIES = ("Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Tyrell", "Cyberdyne", "Soylent")
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choices(WORDS, k=n))
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Loader:
+    """Writes row tuples with COPY on PostgreSQL and chunked INSERTs elsewhere."""
+
+    def __init__(self, db):
+        self.db = db
+        self.copy = None
+
+    async def start(self) -> None:
+        conn = await self.db.connection()
+        if conn.dialect.name == "postgresql":
+            # A statement through SQLAlchemy first, so the driver connection is
+            # already inside the session's transaction when COPY runs on it
+            await conn.execute(text("SELECT 1"))
+            raw = await conn.get_raw_connection()
+            self.copy = raw.driver_connection.copy_records_to_table
+
+    async def next_id(self, model) -> int:
+        return ((await self.db.scalar(select(func.max(model.id)))) or 0) + 1
+
+    async def load(self, model, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+        table = model.__table__
+        json_columns = [i for i, name in enumerate(columns) if isinstance(table.c[name].type, JSON)]
+        count = 0
+        for chunk in _chunks(rows, CHUNK_SIZE):
+            if self.copy is not None:
+                # The dialect's json/jsonb codecs take serialized text
+                if json_columns:
+                    chunk = [
+                        tuple(json.dumps(v) if i in json_columns and v is not None else v for i, v in enumerate(row))
+                        for row in chunk
+                    ]
+                await self.copy(table.name, records=chunk, columns=list(columns))
+            else:
+                await self.db.execute(insert(table), [dict(zip(columns, row)) for row in chunk])
+            count += len(chunk)
+        return count
+
+    async def finish(self, models) -> None:
+        for model in models:
+            table = model.__tablename__
+            if self.copy is not None:
+                await self.db.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT coalesce(max(id), 1) FROM {table}))"
+                ))
+            await self.db.execute(text(f"ANALYZE {table}"))
+
+
+def user_rows(rng: random.Random, first_id: int, count: int, hashed: str) -> Iterator[tuple]:
+    for user_id in range(first_id, first_id + count):
+        yield (user_id, f"user{user_id}@{GENERATED_EMAIL_DOMAIN}", hashed, True, False, True)
+
+
+def project_rows(
+    rng: random.Random, first_id: int, count: int, user_ids: range, versions: int
+) -> Iterator[tuple]:
+    for n, project_id in enumerate(range(first_id, first_id + count)):
+        yield (
+            project_id,
+            user_ids[n % len(user_ids)],
+            f"{_words(rng, 2).title()} project",
+            _words(rng, 12),
+            rng.choice(("Pending", "Active", "Completed")),
+            EPOCH - timedelta(days=rng.randrange(365), seconds=rng.randrange(86400)),
+            versions,
+        )
+
+
+def onboarding_rows(rng: random.Random, first_id: int, project_ids: range) -> Iterator[tuple]:
+    for form_id, project_id in zip(range(first_id, first_id + len(project_ids)), project_ids):
+        yield (
+            form_id,
+            project_id,
+            {
+                "project_goals": _words(rng, 10),
+                "budget": f"${rng.randrange(5, 200) * 1000:,}",
+                "timeline": f"{rng.randrange(1, 12)} months",
+            },
+            "completed",
+            EPOCH - timedelta(days=rng.randrange(365)),
+        )
+
+
+def _proposal_document(rng: random.Random, sections: int) -> List[str]:
+    lines = ["# Proposal\n"]
+    for section in range(sections):
+        lines.append(f"\n## {_words(rng, 2).title()}\n\n")
+        lines.extend(f"- {_words(rng, rng.randrange(6, 14))}\n" for _ in range(4))
+    return lines
+
+
+def proposal_rows(rng: random.Random, first_id: int, project_ids: range, versions: int) -> Iterator[tuple]:
+    """Version histories where each version rewrites a few lines of the previous one"""
+    proposal_id = first_id
+    for project_id in project_ids:
+        lines = _proposal_document(rng, sections=6)
+        previous = None
+        created_at = EPOCH - timedelta(days=rng.randrange(30, 365))
+        for version in range(1, versions + 1):
+            if previous is not None:
+                for _ in range(rng.randrange(1, 4)):
+                    lines[rng.randrange(1, len(lines))] = f"- {_words(rng, rng.randrange(6, 14))}\n"
+            content = "".join(lines)
+            encoding, data = proposal_store.encode(version, content, previous)
+            created_at += timedelta(hours=rng.randrange(1, 72))
+            yield (proposal_id, project_id, version, encoding, data, content_hash(content), created_at)
+            proposal_id += 1
+            previous = content
+
+
+def post_rows(rng: random.Random, first_id: int, count: int) -> Iterator[tuple]:
+    for n, post_id in enumerate(range(first_id, first_id + count)):
+        created_at = EPOCH - timedelta(minutes=n * 37 + rng.randrange(37))
+        paragraphs = "\n\n".join(_words(rng, rng.randrange(40, 80)) for _ in range(rng.randrange(3, 8)))
+        yield (
+            post_id,
+            _words(rng, rng.randrange(3, 7)).capitalize(),
+            f"## {_words(rng, 2).title()}\n\n{paragraphs}",
+            rng.choice(CATEGORIES),
+            created_at,
+            created_at,
+        )
+
+
+def comment_rows(
+    rng: random.Random, first_id: int, post_ids: range, per_post: int, user_ids: range
+) -> Iterator[tuple]:
+    comment_id = first_id
+    for post_id in post_ids:
+        first_on_post = comment_id
+        created_at = EPOCH - timedelta(days=30)
+        for _ in range(per_post):
+            parent_id = None
+            if comment_id > first_on_post and rng.random() < REPLY_RATE:
+                parent_id = rng.randrange(first_on_post, comment_id)
+            created_at += timedelta(seconds=rng.randrange(1, 60))
+            yield (
+                comment_id,
+                post_id,
+                rng.choice(user_ids),
+                parent_id,
+                _words(rng, rng.randrange(5, 30)).capitalize(),
+                created_at,
+            )
+            comment_id += 1
+
+
+def lead_rows(rng: random.Random, first_id: int, count: int) -> Iterator[tuple]:
+    for n, lead_id in enumerate(range(first_id, first_id + count)):
+        company = rng.choice(COMPANIES)
+        created_at = EPOCH - timedelta(seconds=(count - n) * 30 + rng.randrange(30))
+        scored = rng.random() < SCORED_RATE
+        yield (
+            lead_id,
+            f"Lead {lead_id}",
+            f"lead{lead_id}@{company.lower()}.example.com",
+            company,
+            _words(rng, rng.randrange(10, 40)).capitalize(),
+            str(uuid.uuid5(SUBMISSION_NAMESPACE, str(lead_id))),
+            rng.choice(AIService.LEAD_INTENTS) if scored else None,
+            rng.choice(AIService.LEAD_URGENCIES) if scored else None,
+            rng.randrange(0, 101) if scored else None,
+            created_at + timedelta(minutes=rng.randrange(1, 10)) if scored else None,
+            1 if scored else 0,
+            created_at,
+            created_at,
+        )
+
+
+async def generate(args) -> None:
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    # The SQLite search index only follows inserts made after its triggers exist
+    await ensure_sqlite_fts(engine)
+
+    rng = random.Random(args.seed)
+    async with async_session_factory() as db:
+        loader = Loader(db)
+        await loader.start()
+
+        async def load(model, columns, rows) -> range:
+            first_id = await loader.next_id(model)
+            started = time.perf_counter()
+            count = await loader.load(model, columns, rows(first_id))
+            print(f"{model.__tablename__}: {count} rows in {time.perf_counter() - started:.1f}s")
+            return range(first_id, first_id + count)
+
+        hashed = password_helper.hash(GENERATED_PASSWORD)
+        user_ids = await load(
+            User, ("id", "email", "hashed_password", "is_active", "is_superuser", "is_verified"),
+            lambda first_id: user_rows(rng, first_id, args.users, hashed),
+        )
+        project_ids = await load(
+            Project, ("id", "user_id", "name", "description", "status", "created_at", "proposal_version"),
+            lambda first_id: project_rows(rng, first_id, args.projects, user_ids, args.proposal_versions),
+        )
+        await load(
+            OnboardingForm, ("id", "project_id", "form_data", "processing_status", "submitted_at"),
+            lambda first_id: onboarding_rows(rng, first_id, project_ids),
+        )
+        await load(
+            Proposal,
+            ("id", "project_id", "version", "content_encoding", "content_delta", "content_hash", "created_at"),
+            lambda first_id: proposal_rows(rng, first_id, project_ids, args.proposal_versions),
+        )
+        post_ids = await load(
+            BlogPost, ("id", "title", "content", "category", "created_at", "updated_at"),
+            lambda first_id: post_rows(rng, first_id, args.posts),
+        )
+        await load(
+            BlogComment, ("id", "post_id", "user_id", "parent_id", "content", "created_at"),
+            lambda first_id: comment_rows(rng, first_id, post_ids, args.comments_per_post, user_ids),
+        )
+        await load(
+            Lead,
+            (
+                "id", "name", "email", "company", "business_need", "submission_id", "intent", "urgency",
+                "fit_score", "scored_at", "score_attempts", "created_at", "updated_at",
+            ),
+            lambda first_id: lead_rows(rng, first_id, args.leads),
+        )
+
+        await loader.finish((User, Project, OnboardingForm, Proposal, BlogPost, BlogComment, Lead))
+        await db.commit()
+    print(f"Generated users can sign in as user<id>@{GENERATED_EMAIL_DOMAIN} / {GENERATED_PASSWORD}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk-load a deterministic synthetic dataset")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--proposal-versions", type=int, default=10, help="proposal versions per project")
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--comments-per-post", type=int, default=20)
+    parser.add_argument("--leads", type=int, default=100000)
+    args = parser.parse_args()
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+    asyncio.run(generate(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Query-plan regression check for the hot project and blog queries.
+
+Seeds a large synthetic dataset inside a transaction, runs every hot
+``ProjectCRUD``/``BlogCRUD`` read against it, EXPLAINs each statement they
+issued and exits non-zero if any plan falls back to a sequential scan of a
+table. The transaction is rolled back at the end, but the seeding still
+takes real I/O, so point it at a scratch or CI database:
+
+    python -m app.db.plan_check [--scale N]
+
+Works on PostgreSQL (``EXPLAIN (FORMAT JSON)``; run the migrations first) and
+on SQLite (``EXPLAIN QUERY PLAN``; schema from the models).
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, List, Tuple
+
+from sqlalchemy import event, insert, select, text
+
+from app.core.db import Base, async_session_factory, engine
+from app.db.blog import BlogCRUD, ensure_sqlite_fts
+from app.db.project import ProjectCRUD
+from app.models.blog import BlogPost
+from app.models.comment import BlogComment
+from app.models.project import OnboardingForm, Project, Proposal
+from app.models.user import User
+
+TABLES = set(Base.metadata.tables)
+SEED_EMAIL_DOMAIN = "plan-check.invalid"
+CHUNK_SIZE = 5000
+
+
+async def _insert_chunked(db, model, rows: List[dict]) -> None:
+    for start in range(0, len(rows), CHUNK_SIZE):
+        await db.execute(insert(model), rows[start:start + CHUNK_SIZE])
+
+
+async def seed(db, scale: int) -> dict:
+    """Insert the synthetic dataset; returns ids for the queries to target"""
+    now = datetime.utcnow()
+    users = 500 * scale
+    await _insert_chunked(db, User, [
+        {
+            "email": f"user{i}@{SEED_EMAIL_DOMAIN}",
+            "hashed_password": "x",
+            "is_active": True,
+            "is_superuser": False,
+            "is_verified": True,
+        }
+        for i in range(users)
+    ])
+    user_ids = (await db.scalars(
+        select(User.id).filter(User.email.like(f"%@{SEED_EMAIL_DOMAIN}")).order_by(User.id)
+    )).all()
+
+    await _insert_chunked(db, Project, [
+        {"user_id": user_id, "name": f"Project {n}", "status": "Pending", "proposal_version": 4}
+        for user_id in user_ids
+        for n in range(5)
+    ])
+    project_ids = (await db.scalars(
+        select(Project.id)
+        .join(User, User.id == Project.user_id)
+        .filter(User.email.like(f"%@{SEED_EMAIL_DOMAIN}"))
+        .order_by(Project.id)
+    )).all()
+
+    await _insert_chunked(db, OnboardingForm, [
+        {
+            "project_id": project_id,
+            "form_data": {"project_goals": f"goal {project_id}"},
+            "processing_status": "completed",
+            "submitted_at": now - timedelta(minutes=n),
+        }
+        for project_id in project_ids
+        for n in range(2)
+    ])
+    await _insert_chunked(db, Proposal, [
+        {
+            "project_id": project_id,
+            "version": version,
+            "content": f"# Proposal {project_id} v{version}",
+            "created_at": now,
+        }
+        for project_id in project_ids
+        for version in range(1, 5)
+    ])
+
+    posts = 5000 * scale
+    await _insert_chunked(db, BlogPost, [
+        {
+            "title": f"Post {i}",
+            "content": f"Notes on topic{i % 500} and workflow{i % 97}",
+            "category": f"category{i % 20}",
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now,
+        }
+        for i in range(posts)
+    ])
+    post_id = (await db.scalars(select(BlogPost.id).order_by(BlogPost.id.desc()).limit(1))).one()
+    await _insert_chunked(db, BlogComment, [
+        {
+            "post_id": post_id - (i // 4),
+            "user_id": user_ids[i % len(user_ids)],
+            "content": f"Comment {i}",
+            "created_at": now - timedelta(seconds=i),
+        }
+        for i in range(posts * 4)
+    ])
+
+    for table in ("users", "projects", "onboarding_forms", "proposals", "blog_posts", "blog_comments"):
+        await db.execute(text(f"ANALYZE {table}"))
+
+    user_id = user_ids[-1]
+    project_id = project_ids[-1]
+    proposal_id = (await db.scalars(
+        select(Proposal.id).filter(Proposal.project_id == project_id).limit(1)
+    )).one()
+    return {"user_id": user_id, "project_id": project_id, "proposal_id": proposal_id, "post_id": post_id}
+
+
+def hot_queries(ids: dict) -> List[Tuple[str, Callable[[Any], Awaitable[Any]]]]:
+    user_id, project_id = ids["user_id"], ids["project_id"]
+    return [
+        ("project.get_for_user", lambda db: ProjectCRUD.get_for_user(
+            db, project_id, user_id, load_forms=True, load_proposals=True)),
+        ("project.get_multi", lambda db: ProjectCRUD.get_multi(db, user_id)),
+        ("project.get_dashboard", lambda db: ProjectCRUD.get_dashboard(db, user_id)),
+        ("project.get_proposal_for_user", lambda db: ProjectCRUD.get_proposal_for_user(
+            db, project_id, ids["proposal_id"], user_id)),
+        ("project.get_proposal_versions_for_user", lambda db: ProjectCRUD.get_proposal_versions_for_user(
+            db, project_id, user_id)),
+        ("project.get_proposals_by_project", lambda db: ProjectCRUD.get_proposals_by_project(db, project_id)),
+        ("project.get_latest_proposal", lambda db: ProjectCRUD.get_latest_proposal(db, project_id)),
+        ("project.get_version_rows", lambda db: ProjectCRUD._get_version_rows(db, project_id, 1, 4)),
+        ("project.get_onboarding_forms_by_project", lambda db: ProjectCRUD.get_onboarding_forms_by_project(
+            db, project_id)),
+        ("project.get_onboarding_data", lambda db: ProjectCRUD.get_onboarding_data(db, project_id)),
+        ("blog.get_posts", lambda db: BlogCRUD.get_posts(db, limit=20)),
+        ("blog.get_comments", lambda db: BlogCRUD.get_comments(db, ids["post_id"])),
+        ("blog.search", lambda db: BlogCRUD.search(db, "topic42")),
+    ]
+
+
+def _postgres_seq_scans(plan: Any) -> List[str]:
+    found = []
+    if isinstance(plan, dict):
+        if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in TABLES:
+            found.append(plan["Relation Name"])
+        for value in plan.values():
+            found.extend(_postgres_seq_scans(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            found.extend(_postgres_seq_scans(item))
+    return found
+
+
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(.*)$")
+
+
+def _sqlite_seq_scans(rows) -> List[str]:
+    found = []
+    for row in rows:
+        match = _SQLITE_SCAN.match(row[-1])
+        if not match or "USING" in match.group(2) or "VIRTUAL TABLE" in match.group(2):
+            continue
+        # SQLAlchemy aliases tables as <table>_<n>
+        table = re.sub(r"_\d+$", "", match.group(1))
+        if table in TABLES:
+            found.append(table)
+    return found
+
+
+async def explain(db, statement: str, parameters) -> List[str]:
+    """Tables the statement reads with a sequential scan"""
+    conn = await db.connection()
+    if conn.dialect.name == "postgresql":
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar_one()
+        return _postgres_seq_scans(json.loads(plan) if isinstance(plan, str) else plan)
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return _sqlite_seq_scans(result.all())
+
+
+async def run(scale: int) -> int:
+    captured: List[Tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            captured.append((statement, parameters))
+
+    failures = 0
+    await ensure_sqlite_fts(engine)
+    async with async_session_factory() as db:
+        try:
+            ids = await seed(db, scale)
+            for name, query in hot_queries(ids):
+                captured.clear()
+                event.listen(engine.sync_engine, "before_cursor_execute", capture)
+                try:
+                    await query(db)
+                finally:
+                    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+                statements = [(s, p) for s, p in captured if s.lstrip().upper().startswith(("SELECT", "WITH"))]
+                scans = []
+                for statement, parameters in statements:
+                    scans.extend(await explain(db, statement, parameters))
+                if scans:
+                    failures += 1
+                    print(f"FAIL {name}: sequential scan on {', '.join(sorted(set(scans)))}")
+                else:
+                    print(f"ok   {name} ({len(statements)} statement(s))")
+        finally:
+            await db.rollback()
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fail if a hot query plans a sequential scan")
+    parser.add_argument("--scale", type=int, default=1, help="multiplier for the seeded row counts")
+    args = parser.parse_args()
+    failures = asyncio.run(run(args.scale))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,24 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional, Dict, Any
 import json
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import select, func, insert, update, delete
 
 from app.models.project import Project as ProjectModel, OnboardingForm, Proposal
 from app.schemas.project import ProjectCreate, ProjectUpdate, OnboardingFormCreate, ProposalCreate
 from app.core.db import get_db
+from app.services.markdown_service import content_hash, markdown_service
+from app.services.proposal_store import ENCODING_DELTA, proposal_store
 
 class ProjectCRUD:
+    """Project, onboarding form and proposal queries.
+
+    Mutations only execute statements; inserts and updates come back through
+    RETURNING. Committing is left to the caller, so a request's writes land
+    in one transaction with a single COMMIT.
+    """
+
     @staticmethod
     async def get(db, project_id: int) -> Optional[ProjectModel]:
         result = await db.execute(
@@ -16,6 +26,31 @@ class ProjectCRUD:
         )
         return result.scalars().first()
 
+    @staticmethod
+    async def get_for_user(
+        db,
+        project_id: int,
+        user_id: int,
+        load_forms: bool = False,
+        load_proposals: bool = False,
+    ) -> Optional[ProjectModel]:
+        """Fetch a project only if it belongs to the user, in one statement.
+
+        Onboarding forms and proposals can be joined into the same query.
+        """
+        stmt = select(ProjectModel).filter(
+            ProjectModel.id == project_id, ProjectModel.user_id == user_id
+        )
+        if load_forms:
+            stmt = stmt.options(joinedload(ProjectModel.onboarding_forms))
+        if load_proposals:
+            stmt = stmt.options(joinedload(ProjectModel.proposals))
+        result = await db.execute(stmt)
+        project = result.unique().scalars().first()
+        if project is not None and load_proposals:
+            await ProjectCRUD.load_proposal_contents(db, project.proposals)
+        return project
+
     @staticmethod
     async def get_multi(db, user_id: int, skip: int = 0, limit: int = 100) -> List[ProjectModel]:
         result = await db.execute(
@@ -26,24 +61,85 @@ class ProjectCRUD:
         )
         return result.scalars().all()
 
+    @staticmethod
+    async def get_dashboard(
+        db, user_id: int, before_id: Optional[int] = None, limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """One page of the user's projects, newest first, with per-project aggregates.
+
+        The page is selected first and the grouped aggregate subqueries are
+        restricted to it, so the cost tracks the page size, not the history.
+        """
+        page_filter = [ProjectModel.user_id == user_id]
+        if before_id is not None:
+            page_filter.append(ProjectModel.id < before_id)
+        page = (
+            select(ProjectModel.id)
+            .filter(*page_filter)
+            .order_by(ProjectModel.id.desc())
+            .limit(limit)
+            .cte("page")
+        )
+
+        proposal_stats = (
+            select(
+                Proposal.project_id,
+                func.max(Proposal.version).label("latest_proposal_version"),
+                func.max(Proposal.created_at).label("latest_proposal_at"),
+            )
+            .filter(Proposal.project_id.in_(select(page.c.id)))
+            .group_by(Proposal.project_id)
+            .subquery()
+        )
+        form_stats = (
+            select(
+                OnboardingForm.project_id,
+                func.count(OnboardingForm.id).label("onboarding_form_count"),
+                func.max(OnboardingForm.id).label("latest_form_id"),
+            )
+            .filter(OnboardingForm.project_id.in_(select(page.c.id)))
+            .group_by(OnboardingForm.project_id)
+            .subquery()
+        )
+        latest_form = aliased(OnboardingForm)
+
+        result = await db.execute(
+            select(
+                ProjectModel.id,
+                ProjectModel.user_id,
+                ProjectModel.name,
+                ProjectModel.description,
+                ProjectModel.status,
+                ProjectModel.created_at,
+                proposal_stats.c.latest_proposal_version,
+                proposal_stats.c.latest_proposal_at,
+                func.coalesce(form_stats.c.onboarding_form_count, 0).label("onboarding_form_count"),
+                latest_form.processing_status.label("latest_processing_status"),
+            )
+            .join(page, page.c.id == ProjectModel.id)
+            .outerjoin(proposal_stats, proposal_stats.c.project_id == ProjectModel.id)
+            .outerjoin(form_stats, form_stats.c.project_id == ProjectModel.id)
+            .outerjoin(latest_form, latest_form.id == form_stats.c.latest_form_id)
+            .order_by(ProjectModel.id.desc())
+        )
+        return result.mappings().all()
+
     @staticmethod
     async def create(db, user_id: int, project_in: ProjectCreate) -> ProjectModel:
-        project = ProjectModel(
-            user_id=user_id,
-            name=project_in.name,
-            description=project_in.description
-        )
-        db.add(project)
-        await db.commit()
-        await db.refresh(project)
-        return project
+        result = await db.scalars(
+            insert(ProjectModel)
+            .values(
+                user_id=user_id,
+                name=project_in.name,
+                description=project_in.description
+            )
+            .returning(ProjectModel)
+        )
+        return result.one()
 
     @staticmethod
-    async def update(db, project_id: int, project_in: ProjectUpdate) -> Optional[ProjectModel]:
-        project = await ProjectCRUD.get(db, project_id)
-        if not project:
-            return None
-        
+    async def update(db, project: ProjectModel, project_in: ProjectUpdate) -> ProjectModel:
+        project_id = project.id
         update_data = project_in.dict(exclude_unset=True)
         
         # Handle onboarding_data separately if it exists
@@ -61,45 +157,45 @@ class ProjectCRUD:
         # Handle proposal separately if it exists
         if "proposal" in update_data and update_data["proposal"]:
             # Create a new proposal version
-            proposal = Proposal(
-                project_id=project_id,
-                content=update_data["proposal"],
-                version=await ProjectCRUD._get_next_proposal_version(db, project_id)
+            await ProjectCRUD.create_proposal(
+                db, ProposalCreate(project_id=project_id, content=update_data["proposal"])
             )
-            db.add(proposal)
             # Remove from update_data as it's handled separately
             del update_data["proposal"]
         
         # Update the project with remaining fields
-        for key, value in update_data.items():
-            setattr(project, key, value)
+        if update_data:
+            result = await db.scalars(
+                update(ProjectModel)
+                .where(ProjectModel.id == project_id)
+                .values(**update_data)
+                .returning(ProjectModel),
+                execution_options={"populate_existing": True},
+            )
+            project = result.one()
         
-        await db.commit()
-        await db.refresh(project)
         return project
 
     @staticmethod
-    async def delete(db, project_id: int) -> bool:
-        project = await ProjectCRUD.get(db, project_id)
-        if not project:
-            return False
-        await db.delete(project)
-        await db.commit()
-        return True
+    async def delete(db, project: ProjectModel) -> None:
+        # Forms and proposals go with it through ON DELETE CASCADE
+        await db.execute(delete(ProjectModel).where(ProjectModel.id == project.id))
+        db.expunge(project)
     
     @staticmethod
     async def _get_next_proposal_version(db, project_id: int) -> int:
-        """Get the next version number for a proposal"""
+        """Allocate the next version number for a proposal.
+
+        Bumps the project's counter in one statement; the row lock it takes
+        makes concurrent generations for a project get distinct versions.
+        """
         result = await db.execute(
-            select(Proposal)
-            .filter(Proposal.project_id == project_id)
-            .order_by(Proposal.version.desc())
+            update(ProjectModel)
+            .where(ProjectModel.id == project_id)
+            .values(proposal_version=ProjectModel.proposal_version + 1)
+            .returning(ProjectModel.proposal_version)
         )
-        latest_proposal = result.scalars().first()
-        
-        if latest_proposal:
-            return latest_proposal.version + 1
-        return 1
+        return result.scalar_one()
     
     @staticmethod
     async def get_latest_proposal(db, project_id: int) -> Optional[Proposal]:
@@ -108,8 +204,12 @@ class ProjectCRUD:
             select(Proposal)
             .filter(Proposal.project_id == project_id)
             .order_by(Proposal.version.desc())
+            .limit(1)
         )
-        return result.scalars().first()
+        proposal = result.scalars().first()
+        if proposal is not None:
+            await ProjectCRUD.load_proposal_contents(db, [proposal])
+        return proposal
     
     @staticmethod
     async def get_onboarding_data(db, project_id: int) -> Optional[Dict[str, Any]]:
@@ -128,15 +228,11 @@ class ProjectCRUD:
     # Onboarding Form CRUD operations
     @staticmethod
     async def create_onboarding_form(db, form: OnboardingFormCreate) -> OnboardingForm:
-        db_form = OnboardingForm(
-            project_id=form.project_id,
-            form_data=form.form_data,
-            file_path=form.file_path
+        values = form.dict(exclude_none=True)
+        result = await db.scalars(
+            insert(OnboardingForm).values(**values).returning(OnboardingForm)
         )
-        db.add(db_form)
-        await db.commit()
-        await db.refresh(db_form)
-        return db_form
+        return result.one()
 
     @staticmethod
     async def get_onboarding_form(db, form_id: int) -> Optional[OnboardingForm]:
@@ -154,37 +250,120 @@ class ProjectCRUD:
 
     @staticmethod
     async def update_onboarding_form(db, form_id: int, form_data: Dict[str, Any]) -> Optional[OnboardingForm]:
-        db_form = await ProjectCRUD.get_onboarding_form(db, form_id)
-        if db_form:
-            for key, value in form_data.items():
-                setattr(db_form, key, value)
-            await db.commit()
-            await db.refresh(db_form)
-        return db_form
+        result = await db.scalars(
+            update(OnboardingForm)
+            .where(OnboardingForm.id == form_id)
+            .values(**form_data)
+            .returning(OnboardingForm),
+            execution_options={"populate_existing": True},
+        )
+        return result.first()
+
+    # Proposal content storage
+    @staticmethod
+    async def _get_version_rows(db, project_id: int, low: int, high: int) -> List[Any]:
+        """Stored form of a project's proposal versions ``low``..``high``"""
+        result = await db.execute(
+            select(
+                Proposal.id,
+                Proposal.project_id,
+                Proposal.version,
+                Proposal.content,
+                Proposal.content_encoding,
+                Proposal.content_delta,
+                Proposal.content_hash,
+            )
+            .filter(Proposal.project_id == project_id, Proposal.version.between(low, high))
+        )
+        return result.all()
+
+    @staticmethod
+    def _decode_versions(rows) -> Dict[Any, str]:
+        """Rebuild the text of each row, oldest first so deltas find their base"""
+        texts = {}
+        for row in sorted(rows, key=lambda row: (row.project_id, row.version)):
+            key = (row.project_id, row.version)
+            if key in texts:
+                continue
+            if row.content_encoding is None:
+                texts[key] = row.content
+                continue
+            text = proposal_store.get(row.id, row.content_hash)
+            if text is None:
+                text = proposal_store.decode(
+                    row.content_encoding,
+                    row.content_delta,
+                    texts.get((row.project_id, row.version - 1)),
+                )
+                # A delta re-encoded against a base that has since changed
+                # would otherwise decode to the wrong text without notice
+                if row.content_hash is not None and content_hash(text) != row.content_hash:
+                    raise ValueError(
+                        f"Proposal {row.id} (project {row.project_id} v{row.version}) "
+                        f"does not match its content hash"
+                    )
+                proposal_store.set(row.id, row.content_hash, text)
+            texts[key] = text
+        return texts
+
+    @staticmethod
+    async def load_proposal_contents(db, proposals: List[Proposal]) -> List[Proposal]:
+        """Fill in ``content`` of proposals loaded in their stored form.
+
+        Versions missing from ``proposals`` that a delta chain needs are
+        fetched in one query per project, unless the version is cached.
+        """
+        present = {(p.project_id, p.version) for p in proposals}
+        ranges: Dict[int, List[int]] = {}
+        for p in proposals:
+            if p.content_encoding != ENCODING_DELTA or proposal_store.get(p.id, p.content_hash) is not None:
+                continue
+            low = proposal_store.checkpoint_for(p.version)
+            if all((p.project_id, v) in present for v in range(low, p.version)):
+                continue
+            bounds = ranges.setdefault(p.project_id, [low, p.version - 1])
+            bounds[0] = min(bounds[0], low)
+            bounds[1] = max(bounds[1], p.version - 1)
+
+        rows = list(proposals)
+        for project_id, (low, high) in ranges.items():
+            rows.extend(await ProjectCRUD._get_version_rows(db, project_id, low, high))
+
+        texts = ProjectCRUD._decode_versions(rows)
+        for p in proposals:
+            # Not a change to persist, so keep the attribute clean
+            set_committed_value(p, "content", texts[(p.project_id, p.version)])
+        return proposals
 
     # Proposal CRUD operations
     @staticmethod
     async def create_proposal(db, proposal: ProposalCreate) -> Proposal:
-        # Get the latest version for this project
-        result = await db.execute(
-            select(Proposal)
-            .filter(Proposal.project_id == proposal.project_id)
-            .order_by(Proposal.version.desc())
+        version = await ProjectCRUD._get_next_proposal_version(db, proposal.project_id)
+        base = None
+        if not proposal_store.is_checkpoint(version):
+            rows = await ProjectCRUD._get_version_rows(
+                db, proposal.project_id, proposal_store.checkpoint_for(version), version - 1
+            )
+            base = ProjectCRUD._decode_versions(rows).get((proposal.project_id, version - 1))
+        encoding, data = proposal_store.encode(version, proposal.content, base)
+
+        digest, html, toc = await markdown_service.render(proposal.content)
+        result = await db.scalars(
+            insert(Proposal)
+            .values(
+                project_id=proposal.project_id,
+                content_encoding=encoding,
+                content_delta=data,
+                content_hash=digest,
+                content_html=html,
+                content_toc=toc,
+                version=version
+            )
+            .returning(Proposal)
         )
-        latest_version = result.scalars().first()
-        
-        version = 1
-        if latest_version:
-            version = latest_version.version + 1
-        
-        db_proposal = Proposal(
-            project_id=proposal.project_id,
-            content=proposal.content,
-            version=version
-        )
-        db.add(db_proposal)
-        await db.commit()
-        await db.refresh(db_proposal)
+        db_proposal = result.one()
+        proposal_store.set(db_proposal.id, digest, proposal.content)
+        set_committed_value(db_proposal, "content", proposal.content)
         return db_proposal
 
     @staticmethod
@@ -192,7 +371,50 @@ class ProjectCRUD:
         result = await db.execute(
             select(Proposal).filter(Proposal.id == proposal_id)
         )
-        return result.scalars().first()
+        proposal = result.scalars().first()
+        if proposal is not None:
+            await ProjectCRUD.load_proposal_contents(db, [proposal])
+        return proposal
+
+    @staticmethod
+    async def get_proposal_for_user(db, project_id: int, proposal_id: int, user_id: int) -> Optional[Proposal]:
+        """Fetch a proposal of a project owned by the user, in one statement."""
+        result = await db.execute(
+            select(Proposal)
+            .join(ProjectModel, ProjectModel.id == Proposal.project_id)
+            .filter(
+                Proposal.id == proposal_id,
+                Proposal.project_id == project_id,
+                ProjectModel.user_id == user_id,
+            )
+        )
+        proposal = result.scalars().first()
+        if proposal is not None:
+            await ProjectCRUD.load_proposal_contents(db, [proposal])
+        return proposal
+
+    @staticmethod
+    async def get_proposal_versions_for_user(db, project_id: int, user_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Version history of a user's project without proposal content.
+
+        Returns None when the project does not exist or is not the user's.
+        """
+        result = await db.execute(
+            select(
+                ProjectModel.id.label("project_id"),
+                Proposal.id,
+                Proposal.version,
+                Proposal.content_hash,
+                Proposal.created_at,
+            )
+            .outerjoin(Proposal, Proposal.project_id == ProjectModel.id)
+            .filter(ProjectModel.id == project_id, ProjectModel.user_id == user_id)
+            .order_by(Proposal.version.desc())
+        )
+        rows = result.mappings().all()
+        if not rows:
+            return None
+        return [row for row in rows if row["id"] is not None]
 
     @staticmethod
     async def get_proposals_by_project(db, project_id: int) -> List[Proposal]:
@@ -201,13 +423,51 @@ class ProjectCRUD:
             .filter(Proposal.project_id == project_id)
             .order_by(Proposal.version.desc())
         )
-        return result.scalars().all()
+        return await ProjectCRUD.load_proposal_contents(db, result.scalars().all())
 
     @staticmethod
-    async def update_proposal(db, proposal_id: int, content: str) -> Optional[Proposal]:
-        db_proposal = await ProjectCRUD.get_proposal(db, proposal_id)
-        if db_proposal:
-            db_proposal.content = content
-            await db.commit()
-            await db.refresh(db_proposal)
-        return db_proposal
\ No newline at end of file
+    async def update_proposal(db, db_proposal: Proposal, content: str) -> Proposal:
+        project_id, version = db_proposal.project_id, db_proposal.version
+
+        # Same row lock as _get_next_proposal_version, so the versions read
+        # below cannot change under a concurrent create or edit
+        await db.execute(
+            select(ProjectModel.id).where(ProjectModel.id == project_id).with_for_update()
+        )
+        # The edited version's base, and the next version if it is a delta on it
+        high = version if proposal_store.is_checkpoint(version + 1) else version + 1
+        rows = await ProjectCRUD._get_version_rows(
+            db, project_id, proposal_store.checkpoint_for(version), high
+        )
+        texts = ProjectCRUD._decode_versions(rows)
+        encoding, data = proposal_store.encode(version, content, texts.get((project_id, version - 1)))
+
+        next_row = next(
+            (row for row in rows if row.version == version + 1 and row.content_encoding == ENCODING_DELTA),
+            None,
+        )
+        if next_row is not None:
+            _, next_data = proposal_store.encode(version + 1, texts[(project_id, version + 1)], content)
+            await db.execute(
+                update(Proposal).where(Proposal.id == next_row.id).values(content_delta=next_data)
+            )
+
+        digest, html, toc = await markdown_service.render(content)
+        result = await db.scalars(
+            update(Proposal)
+            .where(Proposal.id == db_proposal.id)
+            .values(
+                content=None,
+                content_encoding=encoding,
+                content_delta=data,
+                content_hash=digest,
+                content_html=html,
+                content_toc=toc,
+            )
+            .returning(Proposal),
+            execution_options={"populate_existing": True},
+        )
+        db_proposal = result.one()
+        proposal_store.set(db_proposal.id, digest, content)
+        set_committed_value(db_proposal, "content", content)
+        return db_proposal
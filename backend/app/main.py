@@ -3,26 +3,76 @@ FastAPI application entry point.
 """ 
 
 import os
-from fastapi import FastAPI
+import secrets
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi_users import schemas
 from app.core.config import settings
+from app.core.admission import AdmissionControlMiddleware, admission_stats
+from app.core.security import password_pool
+from app.core.db import engine, pool_liveness, replicas
+from app.core.pool import pool_stats
+from app.core import metrics
+from app.core.metrics import MetricsMiddleware
+from app.core.query_log import QueryLogMiddleware
+from app.core.loop_watchdog import LoopWatchdogMiddleware, loop_watchdog
+from app.core.profiling import ProfilingMiddleware, list_profiles, profile_path
 
 # add routers
 from app.api.leads import router as leads_router
-from app.api.users import auth_backend, fastapi_users
+from app.api.users import auth_backend, fastapi_users, current_superuser, is_superuser_token
 from app.api.blogs import router as blog_router
 from app.api.upload import router as upload_router
 from app.api.project import router as project_router
+from app.db.blog import ensure_sqlite_fts
+
+# background services
+from app.services.lead_rollup import lead_rollup_job
+from app.services.lead_scoring import lead_scoring_pipeline
+from app.services.lead_spool import lead_spool
+from app.services.lead_writer import lead_writer
+from app.services.markdown_service import markdown_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background services."""
+    if settings.LOOP_WATCHDOG_ENABLED:
+        await loop_watchdog.start()
+    await ensure_sqlite_fts(engine)
+    await replicas.start()
+    await pool_liveness.start([engine, *replicas.engines])
+    await lead_spool.start()
+    await lead_rollup_job.start()
+    if settings.LEAD_SCORING_ENABLED:
+        await lead_scoring_pipeline.start()
+    yield
+    await lead_writer.close()
+    await lead_spool.stop()
+    await lead_rollup_job.stop()
+    await lead_scoring_pipeline.stop()
+    markdown_service.shutdown()
+    password_pool.shutdown()
+    await pool_liveness.stop()
+    await replicas.stop()
+    await loop_watchdog.stop()
 
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
+# Shed anonymous floods before they reach a handler or a DB session.
+# Added before CORS so rejections still carry CORS headers.
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
 # Configure CORS
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -33,6 +83,19 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+if settings.QUERY_LOG_ENABLED:
+    app.add_middleware(QueryLogMiddleware)
+
+if settings.LOOP_WATCHDOG_ENABLED:
+    app.add_middleware(LoopWatchdogMiddleware)
+
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, authorize=is_superuser_token)
+
+# Outermost, so requests shed by admission control are counted and timed too
+if settings.METRICS_ENABLED or settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Create uploads directory if it doesn't exist
 UPLOAD_DIR = os.path.join(os.getcwd(), "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -121,4 +184,93 @@ app.include_router(
 @app.get("/")
 async def root():
     """Root endpoint."""
-    return {"message": "Welcome to Art of Workflows API"} 
+    return {"message": "Welcome to Art of Workflows API"}
+
+
+# Admission control counters for dashboards
+@app.get(f"{settings.API_V1_STR}/admission/stats", tags=["admin"])
+async def get_admission_stats(user=Depends(current_superuser)):
+    """Admission control counters."""
+    return admission_stats.as_dict()
+
+
+# Read replica health for dashboards
+@app.get(f"{settings.API_V1_STR}/db/replicas", tags=["admin"])
+async def get_replica_stats(user=Depends(current_superuser)):
+    """Read replica health and replication lag."""
+    return replicas.stats()
+
+
+# Connection pool utilization and checkout waits for dashboards
+@app.get(f"{settings.API_V1_STR}/db/pool", tags=["admin"])
+async def get_pool_stats(user=Depends(current_superuser)):
+    """Connection pool metrics of the primary and each replica."""
+    return {
+        "primary": pool_stats(engine),
+        "replicas": [pool_stats(replica) for replica in replicas.engines],
+    }
+
+
+db_pool_checked_out = metrics.Gauge("db_pool_checked_out", "Connections in use", ["database"])
+db_pool_utilization = metrics.Gauge(
+    "db_pool_utilization", "Connections in use over pool size plus max overflow", ["database"]
+)
+db_pool_wait_seconds_max = metrics.Gauge("db_pool_checkout_wait_seconds_max", "Longest checkout wait", ["database"])
+db_pool_timeouts = metrics.Gauge("db_pool_checkout_timeouts", "Checkouts that timed out", ["database"])
+admission_in_flight = metrics.Gauge("admission_in_flight", "Requests admitted and in flight", ["client"])
+db_replica_healthy = metrics.Gauge("db_replica_healthy", "1 if the replica takes reads", ["database"])
+db_replica_lag_seconds = metrics.Gauge("db_replica_lag_seconds", "Replication lag at the last check", ["database"])
+lead_spool_depth = metrics.Gauge("lead_spool_depth", "Spooled leads waiting for replay")
+lead_spool_replay_lag_seconds = metrics.Gauge(
+    "lead_spool_replay_lag_seconds", "Age of the oldest spooled lead waiting for replay"
+)
+
+
+def collect_runtime_stats() -> None:
+    for name, db_engine in [("primary", engine), *((f"replica{i}", e) for i, e in enumerate(replicas.engines))]:
+        stats = pool_stats(db_engine)
+        db_pool_checked_out.set(name, value=stats.get("checked_out", 0))
+        db_pool_utilization.set(name, value=stats.get("utilization", 0.0))
+        db_pool_wait_seconds_max.set(name, value=stats.get("wait_seconds_max", 0.0))
+        db_pool_timeouts.set(name, value=stats.get("timeouts", 0))
+    for i, stats in enumerate(replicas.stats()):
+        db_replica_healthy.set(f"replica{i}", value=1 if stats["healthy"] else 0)
+        if stats["lag_seconds"] is not None:
+            db_replica_lag_seconds.set(f"replica{i}", value=stats["lag_seconds"])
+    stats = admission_stats.as_dict()
+    admission_in_flight.set("all", value=stats["in_flight"])
+    admission_in_flight.set("anonymous", value=stats["anonymous_in_flight"])
+    stats = lead_spool.stats()
+    lead_spool_depth.set(value=stats["depth"])
+    lead_spool_replay_lag_seconds.set(value=stats["replay_lag_seconds"])
+
+
+metrics.collectors.append(collect_runtime_stats)
+
+
+# Prometheus scrape target; outside the API prefix like most exporters
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(authorization: str | None = Header(None)):
+    """Metrics in the Prometheus text format."""
+    # Fail closed: pool, admission and traffic figures are not public
+    if not settings.METRICS_ENABLED or not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(authorization or "", f"Bearer {settings.METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# Request profiles in collapsed-stack format, for flamegraph.pl or speedscope
+@app.get(f"{settings.API_V1_STR}/profiles", tags=["admin"])
+async def get_profiles(user=Depends(current_superuser)):
+    """Stored request profiles, newest first."""
+    return list_profiles()
+
+
+@app.get(f"{settings.API_V1_STR}/profiles/{{name}}", tags=["admin"])
+async def get_profile(name: str, user=Depends(current_superuser)):
+    """Download one stored request profile."""
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
@@ -1,5 +1,7 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, JSON
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from app.core.db import Base
 
 class BlogPost(Base):
@@ -11,4 +13,18 @@ class BlogPost(Base):
     image_url = Column(String(500), nullable=True)
     category = Column(String(100), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Rendered once on write from `content`; see app/services/markdown_service.py
+    content_html = Column(Text, nullable=True)
+    content_toc = Column(JSON, nullable=True)
+    content_hash = Column(String(64), nullable=True)
+
+    # Full-text search document, maintained by the trigger in migrations/0002_blog_search.sql.
+    # Deferred so regular reads never pull it over the wire.
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True))
+
+    __table_args__ = (
+        Index("ix_blog_posts_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_blog_posts_created_at", "created_at"),
+    )
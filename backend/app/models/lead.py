@@ -3,7 +3,7 @@ Lead model for storing lead submissions.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.core.db import Base
@@ -19,5 +19,34 @@ class Lead(Base):
     email = Column(String(320), nullable=False, index=True)
     company = Column(String(100), nullable=True)
     business_need = Column(Text, nullable=True)
+    # Client-independent idempotency key; lets spooled leads be replayed safely
+    submission_id = Column(String(36), nullable=True, unique=True)
+    # AI classification, filled in asynchronously by app/services/lead_scoring.py
+    intent = Column(String(50), nullable=True)
+    urgency = Column(String(20), nullable=True)
+    fit_score = Column(SmallInteger, nullable=True)
+    scored_at = Column(DateTime, nullable=True)
+    score_attempts = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        # Keeps the scoring pipeline's "next unscored leads" lookup cheap
+        Index("ix_leads_unscored", "id", postgresql_where=scored_at.is_(None)),
+    )
+
+
+class LeadSubmission(Base):
+    """A lead submission that has been written, and the lead it landed in.
+
+    The batch writer merges repeat submissions into an existing lead, so
+    ``leads.submission_id`` only holds the first one; this ledger holds them
+    all and is what spool replay checks before inserting.
+    """
+
+    __tablename__ = "lead_submissions"
+
+    submission_id = Column(String(36), primary_key=True)
+    # NULL when replay found the lead already written by the direct path
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="CASCADE"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False) 
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""
+Rollup tables for lead analytics.
+"""
+
+from sqlalchemy import Column, Integer, String, Date, DateTime, Index
+
+from app.core.db import Base
+
+
+class LeadRollup(Base):
+    """Daily lead counts per dimension value.
+
+    ``dimension`` is one of ``total`` (value is empty), ``company`` or
+    ``business_need`` (value is the normalized text).
+    """
+    
+    __tablename__ = "lead_rollups"
+    
+    day = Column(Date, primary_key=True)
+    dimension = Column(String(32), primary_key=True)
+    value = Column(String(200), primary_key=True)
+    lead_count = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("ix_lead_rollups_dimension_day", "dimension", "day"),
+    )
+
+
+class LeadRollupState(Base):
+    """Watermark of the last lead folded into the rollups."""
+    
+    __tablename__ = "lead_rollup_state"
+    
+    name = Column(String(64), primary_key=True)
+    last_lead_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON, LargeBinary, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel, Field
@@ -33,6 +33,9 @@ class Project(ProjectBase):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("ix_projects_user_id_id", "user_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -40,6 +43,8 @@ class Project(Base):
     description = Column(Text)
     status = Column(String(50), default="Pending")
     created_at = Column(DateTime, default=func.now())
+    # Last proposal version handed out; bumped atomically per new proposal
+    proposal_version = Column(Integer, default=0, nullable=False)
     
     # Relationships
     user = relationship("User", back_populates="projects")
@@ -48,6 +53,9 @@ class Project(Base):
 
 class OnboardingForm(Base):
     __tablename__ = "onboarding_forms"
+    __table_args__ = (
+        Index("ix_onboarding_forms_project_submitted", "project_id", "submitted_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
@@ -62,11 +70,21 @@ class OnboardingForm(Base):
 
 class Proposal(Base):
     __tablename__ = "proposals"
+    __table_args__ = (
+        UniqueConstraint("project_id", "version", name="uq_proposals_project_version"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     version = Column(Integer, default=1, nullable=False)
-    content = Column(Text, nullable=False)
+    # Plain text for rows written before delta storage; NULL otherwise, and
+    # filled in on load by ProjectCRUD (see app/services/proposal_store.py)
+    content = Column(Text)
+    content_encoding = Column(String(20))
+    content_delta = Column(LargeBinary)
+    content_html = Column(Text)
+    content_toc = Column(JSON)
+    content_hash = Column(String(64))
     created_at = Column(DateTime, default=func.now())
     
     # Relationships
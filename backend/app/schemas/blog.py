@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field
 
 class BlogPostBase(BaseModel):
@@ -13,8 +13,23 @@ class BlogPostCreate(BlogPostBase):
 
 class BlogPostResponse(BlogPostBase):
     id: int
+    content_html: Optional[str] = None
+    content_toc: Optional[List[Dict[str, Any]]] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class BlogSearchHit(BaseModel):
+    id: int
+    title: str
+    category: Optional[str] = None
+    image_url: Optional[str] = None
+    created_at: datetime
+    rank: float
+    headline: str
+
+class BlogSearchResponse(BaseModel):
+    total: int
+    items: List[BlogSearchHit]
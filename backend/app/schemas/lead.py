@@ -2,7 +2,7 @@
 Pydantic schemas for lead API.
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from pydantic import BaseModel, EmailStr, Field
 
@@ -21,14 +21,48 @@ class LeadCreate(LeadBase):
     pass
 
 
+class LeadAccepted(LeadBase):
+    """Schema for a lead accepted while the database is unavailable."""
+    
+    status: str = "accepted"
+
+
+class LeadSpoolStats(BaseModel):
+    """Schema for lead spool health."""
+    
+    depth: int
+    replay_lag_seconds: float
+    replayed_total: int
+    last_replay_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+
 class LeadResponse(LeadBase):
     """Schema for lead response."""
     
     id: int
+    intent: Optional[str] = None
+    urgency: Optional[str] = None
+    fit_score: Optional[int] = None
+    scored_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     
     class Config:
         """Pydantic config."""
         
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+
+class LeadDailyCount(BaseModel):
+    """Schema for one day of lead volume."""
+    
+    day: date
+    lead_count: int
+
+
+class LeadValueCount(BaseModel):
+    """Schema for lead volume of one company or business need."""
+    
+    value: str
+    lead_count: int
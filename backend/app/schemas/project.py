@@ -23,12 +23,20 @@ class Project(ProjectBase):
     class Config:
         from_attributes = True
 
+class ProjectSummary(Project):
+    latest_proposal_version: Optional[int] = None
+    latest_proposal_at: Optional[datetime] = None
+    onboarding_form_count: int = 0
+    latest_processing_status: Optional[str] = None
+
 class OnboardingFormBase(BaseModel):
     form_data: Dict[str, Any]
     
 class OnboardingFormCreate(OnboardingFormBase):
     project_id: int
     file_path: Optional[str] = None
+    processing_status: Optional[str] = None
+    extracted_data: Optional[Dict[str, Any]] = None
 
 class OnboardingFormUpdate(BaseModel):
     form_data: Optional[Dict[str, Any]] = None
@@ -61,7 +69,16 @@ class Proposal(ProposalBase):
     id: int
     project_id: int
     version: int
+    content_html: Optional[str] = None
+    content_toc: Optional[List[Dict[str, Any]]] = None
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ProposalVersion(BaseModel):
+    id: int
+    project_id: int
+    version: int
+    content_hash: Optional[str] = None
+    created_at: datetime
@@ -1,8 +1,10 @@
 import os
 import json
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional
 import requests
 from app.core.config import settings
+from app.core.metrics import add_timing, llm_latency, llm_requests
 
 class AIService:
     def __init__(self):
@@ -33,18 +35,27 @@ class AIService:
             }]
         }
         
+        start = time.perf_counter()
+        outcome = "error"
         try:
             response = requests.post(url, headers=headers, json=payload)
             response.raise_for_status()  # Raise exception for HTTP errors
             
             result = response.json()
             if "candidates" in result and len(result["candidates"]) > 0:
+                outcome = "ok"
                 return result["candidates"][0]["content"]["parts"][0]["text"]
             else:
+                outcome = "empty"
                 return "Error: No response generated"
         except Exception as e:
             print(f"Error calling Gemini API: {str(e)}")
             return f"Error generating text: {str(e)}"
+        finally:
+            elapsed = time.perf_counter() - start
+            llm_requests.inc(self.model_name, outcome)
+            llm_latency.observe(self.model_name, value=elapsed)
+            add_timing("ai", elapsed)
     
     def extract_data_from_pdf(self, file_path: str) -> Dict[str, Any]:
         """Extract structured data from a PDF file"""
@@ -88,6 +99,65 @@ class AIService:
                 "tools_and_integrations": "OCR capabilities and database integration"
             }
     
+    LEAD_INTENTS = ("automation", "integration", "data_pipeline", "consulting", "support", "other")
+    LEAD_URGENCIES = ("low", "medium", "high")
+
+    def score_leads(self, leads: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """Classify many leads with a single prompt.
+
+        Each lead is a dict with ``id``, ``company`` and ``business_need``.
+        Returns ``{lead_id: {"intent", "urgency", "fit_score"}}`` for every
+        lead the model answered validly; missing or malformed entries are
+        left out so the caller can retry them. Raises RuntimeError when the
+        API call fails and ValueError when the response is not JSON.
+        """
+        prompt = f"""
+        You are qualifying inbound leads for a workflow automation consultancy.
+        For each lead below, classify:
+        - intent: one of {", ".join(self.LEAD_INTENTS)}
+        - urgency: one of {", ".join(self.LEAD_URGENCIES)}
+        - fit_score: integer 0-100, how well the need fits a custom automation project
+
+        Leads (JSON):
+        {json.dumps(leads)}
+
+        Return ONLY a JSON array with one object per lead, in any order:
+        [{{"id": <lead id>, "intent": "...", "urgency": "...", "fit_score": <int>}}]
+        """
+
+        result = self._generate_text(prompt)
+        if result.startswith("Error"):
+            raise RuntimeError(result)
+
+        # Models often wrap JSON in a Markdown code fence
+        text = result.strip()
+        if text.startswith("```"):
+            text = text.split("\n", 1)[1] if "\n" in text else ""
+            text = text.rsplit("```", 1)[0]
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError:
+            raise ValueError("Lead scoring response was not valid JSON")
+
+        requested = {lead["id"] for lead in leads}
+        scores = {}
+        for item in items if isinstance(items, list) else []:
+            try:
+                lead_id = int(item["id"])
+                intent = str(item["intent"]).lower()
+                urgency = str(item["urgency"]).lower()
+                fit_score = max(0, min(100, int(item["fit_score"])))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if lead_id not in requested:
+                continue
+            scores[lead_id] = {
+                "intent": intent if intent in self.LEAD_INTENTS else "other",
+                "urgency": urgency if urgency in self.LEAD_URGENCIES else "medium",
+                "fit_score": fit_score,
+            }
+        return scores
+
     def index_project_data(self, project_id: int, data: Dict[str, Any]) -> None:
         """Store project data for later retrieval"""
         # Store the data in memory (in a real implementation, you would use a database)
@@ -3,6 +3,7 @@ import shutil
 from fastapi import UploadFile
 from typing import Optional
 import uuid
+from app.core.metrics import timed
 
 class FileService:
     def __init__(self):
@@ -24,7 +25,7 @@ class FileService:
         file_path = os.path.join(project_dir, unique_filename)
         
         # Save the file
-        with open(file_path, "wb") as buffer:
+        with timed("io"), open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
         
         return file_path
\ No newline at end of file
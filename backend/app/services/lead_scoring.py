@@ -0,0 +1,135 @@
+"""
+Background AI scoring and classification of new leads.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.db import async_session_factory
+from app.models.lead import Lead
+from app.services.ai_service import AIService
+
+
+class LeadScoringPipeline:
+    """Scores unscored leads in batches, off the request path.
+
+    Each batch sends up to ``batch_size`` leads in one structured prompt,
+    then writes every score back with a single bulk UPDATE. Leads the model
+    did not answer for have ``score_attempts`` bumped and are retried on
+    later runs until ``max_attempts``. If the API itself is down nothing is
+    counted and the whole batch is retried next interval.
+    """
+
+    def __init__(self, interval: float, batch_size: int, max_attempts: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._ai_service: Optional[AIService] = None
+        self._task: Optional[asyncio.Task] = None
+        self.scored_total = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def ai_service(self) -> AIService:
+        if self._ai_service is None:
+            self._ai_service = AIService()
+        return self._ai_service
+
+    async def run_once(self) -> int:
+        """Score batches until no eligible leads remain; returns how many were scored"""
+        scored = 0
+        while True:
+            count, remaining = await self._score_batch()
+            scored += count
+            if not remaining:
+                break
+        self.scored_total += scored
+        return scored
+
+    async def _score_batch(self):
+        async with async_session_factory() as session:
+            result = await session.execute(
+                select(Lead.id, Lead.company, Lead.business_need)
+                .filter(Lead.scored_at.is_(None), Lead.score_attempts < self.max_attempts)
+                .order_by(Lead.id)
+                .limit(self.batch_size)
+            )
+            rows = result.all()
+        if not rows:
+            return 0, False
+
+        now = datetime.utcnow()
+        # Nothing to classify without a stated need; close those out directly
+        updates = [{"id": row.id, "scored_at": now} for row in rows if not row.business_need]
+        to_score = [
+            {"id": row.id, "company": row.company, "business_need": row.business_need}
+            for row in rows
+            if row.business_need
+        ]
+
+        attempted = []
+        if to_score:
+            # The AI client is synchronous; keep it off the event loop
+            try:
+                scores = await asyncio.to_thread(self.ai_service.score_leads, to_score)
+            except ValueError as e:
+                # The model answered, just unusably; count it as an attempt for all
+                self.last_error = str(e)
+                scores = {}
+            for lead in to_score:
+                score = scores.get(lead["id"])
+                if score is None:
+                    attempted.append(lead["id"])
+                else:
+                    updates.append({"id": lead["id"], **score, "scored_at": now})
+
+        async with async_session_factory() as session:
+            if updates:
+                # ORM bulk UPDATE by primary key: one executemany round trip
+                await session.execute(update(Lead), updates)
+            if attempted:
+                await session.execute(
+                    update(Lead)
+                    .where(Lead.id.in_(attempted))
+                    .values(score_attempts=Lead.score_attempts + 1)
+                    .execution_options(synchronize_session=False)
+                )
+            await session.commit()
+
+        # Retry failures on the next interval rather than immediately
+        return len(updates), len(rows) == self.batch_size and not attempted
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Lead scoring failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+lead_scoring_pipeline = LeadScoringPipeline(
+    interval=settings.LEAD_SCORING_INTERVAL_SECONDS,
+    batch_size=settings.LEAD_SCORING_BATCH_SIZE,
+    max_attempts=settings.LEAD_SCORING_MAX_ATTEMPTS,
+)
@@ -0,0 +1,233 @@
+"""
+Durable local spool for lead submissions the database could not take.
+"""
+
+import asyncio
+import json
+import os
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.config import settings
+from app.core.db import async_session_factory
+from app.models.lead import Lead, LeadSubmission
+
+REPLAY_BATCH_SIZE = 500
+
+
+class LeadSpool:
+    """Append-only, fsync'd journal of leads plus a background replayer.
+
+    Each line of the journal is one JSON entry. A separate checkpoint file
+    records the byte offset up to which entries are known to be in the
+    ``leads`` table. Replays first claim each ``submission_id`` in
+    ``lead_submissions`` and insert only the claimed ones, with ON CONFLICT
+    DO NOTHING on ``leads.submission_id``, so an entry replayed twice, or one
+    whose original write landed (or was merged) before timing out, never
+    creates a duplicate lead.
+    """
+
+    def __init__(self, path: str, replay_interval: float):
+        self.path = path
+        self.offset_path = f"{path}.offset"
+        self.replay_interval = replay_interval
+        self._lock = asyncio.Lock()
+        self._pending: Deque[datetime] = deque()
+        self._offset = 0
+        self._task: Optional[asyncio.Task] = None
+        self.replayed_total = 0
+        self.last_replay_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    # Journal
+
+    async def append(self, lead: Dict[str, Any]) -> None:
+        """Durably record a lead; returns once it is fsync'd to disk"""
+        spooled_at = datetime.utcnow()
+        line = json.dumps({"spooled_at": spooled_at.isoformat(), "lead": lead}, default=str) + "\n"
+        async with self._lock:
+            await asyncio.to_thread(self._write_line, line.encode("utf-8"))
+            self._pending.append(spooled_at)
+
+    def _write_line(self, data: bytes) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _read_entries(self, offset: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Read up to ``limit`` complete entries after ``offset``.
+
+        Returns the entries and the offset just past the last one read. A
+        trailing line without a newline is a torn write and is left alone.
+        """
+        entries = []
+        if not os.path.exists(self.path):
+            return entries, offset
+        with open(self.path, "rb") as journal:
+            journal.seek(offset)
+            while len(entries) < limit:
+                line = journal.readline()
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"Skipping corrupt lead spool entry at offset {offset - len(line)}")
+        return entries, offset
+
+    def _save_offset(self, offset: int) -> None:
+        tmp_path = f"{self.offset_path}.tmp"
+        with open(tmp_path, "w") as checkpoint:
+            checkpoint.write(str(offset))
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+        os.replace(tmp_path, self.offset_path)
+
+    def _load(self) -> None:
+        if os.path.exists(self.offset_path):
+            with open(self.offset_path) as checkpoint:
+                self._offset = int(checkpoint.read().strip() or 0)
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if self._offset > size:
+            print(f"Lead spool offset {self._offset} is past the end of the journal ({size} bytes); replaying it all")
+            self._offset = 0
+        self._pending.clear()
+        offset = self._offset
+        while True:
+            entries, offset = self._read_entries(offset, REPLAY_BATCH_SIZE)
+            if not entries:
+                break
+            self._pending.extend(datetime.fromisoformat(entry["spooled_at"]) for entry in entries)
+
+    # Replay
+
+    async def replay(self) -> int:
+        """Drain the journal into the leads table; returns how many entries were replayed"""
+        replayed = 0
+        while True:
+            entries, next_offset = await asyncio.to_thread(
+                self._read_entries, self._offset, REPLAY_BATCH_SIZE
+            )
+            if not entries:
+                break
+
+            await self._insert([entry["lead"] for entry in entries])
+            await asyncio.to_thread(self._save_offset, next_offset)
+            self._offset = next_offset
+            for _ in entries:
+                if self._pending:
+                    self._pending.popleft()
+            replayed += len(entries)
+
+        self.replayed_total += replayed
+        self.last_replay_at = datetime.utcnow()
+        await self._compact()
+        return replayed
+
+    async def _insert(self, leads: List[Dict[str, Any]]) -> None:
+        now = datetime.utcnow()
+        async with async_session_factory() as session:
+            dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+
+            # Claim the submissions first: the batch writer records every one
+            # it wrote, merged ones included, so those are skipped here
+            claim = (
+                dialect.insert(LeadSubmission)
+                .on_conflict_do_nothing(index_elements=["submission_id"])
+                .returning(LeadSubmission.submission_id)
+            )
+            claimed = set((await session.scalars(
+                claim, [{"submission_id": lead["submission_id"], "created_at": now} for lead in leads]
+            )).all())
+
+            rows = [
+                {
+                    **lead,
+                    "created_at": datetime.fromisoformat(lead["created_at"]),
+                    "updated_at": datetime.fromisoformat(lead["created_at"]),
+                }
+                for lead in leads
+                if lead["submission_id"] in claimed
+            ]
+            if rows:
+                stmt = (
+                    dialect.insert(Lead)
+                    .on_conflict_do_nothing(index_elements=["submission_id"])
+                    .returning(Lead.id, Lead.submission_id)
+                )
+                inserted = (await session.execute(stmt, rows)).all()
+                if inserted:
+                    await session.execute(
+                        update(LeadSubmission),
+                        [{"submission_id": submission_id, "lead_id": lead_id} for lead_id, submission_id in inserted],
+                    )
+            await session.commit()
+
+    async def _compact(self) -> None:
+        """Truncate the journal once everything in it has been replayed"""
+        async with self._lock:
+            if not os.path.exists(self.path) or os.path.getsize(self.path) != self._offset:
+                return
+            await asyncio.to_thread(self._truncate)
+            self._offset = 0
+
+    def _truncate(self) -> None:
+        # Checkpoint first: a crash in between then replays the old entries,
+        # which the submission claim makes harmless, instead of leaving a
+        # stale offset past the end of a fresh journal
+        self._save_offset(0)
+        with open(self.path, "wb") as journal:
+            os.fsync(journal.fileno())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self._pending:
+                    await self.replay()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Database still unavailable; keep the entries and retry later
+                self.last_error = str(e)
+            await asyncio.sleep(self.replay_interval)
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self._load)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # Metrics
+
+    def stats(self) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        return {
+            "depth": len(self._pending),
+            "replay_lag_seconds": (now - self._pending[0]).total_seconds() if self._pending else 0.0,
+            "replayed_total": self.replayed_total,
+            "last_replay_at": self.last_replay_at,
+            "last_error": self.last_error,
+        }
+
+
+lead_spool = LeadSpool(
+    path=settings.LEAD_SPOOL_PATH,
+    replay_interval=settings.LEAD_SPOOL_REPLAY_INTERVAL_SECONDS,
+)
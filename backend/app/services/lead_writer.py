@@ -0,0 +1,149 @@
+"""
+Write-behind batching for public lead submissions.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+
+from app.core.config import settings
+from app.core.db import async_session_factory
+from app.models.lead import Lead, LeadSubmission
+
+MERGED_FIELDS = ("name", "company", "business_need")
+
+
+class LeadBatchWriter:
+    """Buffers lead submissions and writes them in one transaction per batch.
+
+    A batch is flushed after ``max_delay_ms`` or once ``max_size`` leads are
+    waiting, whichever comes first. New leads go out as a single multi-row
+    ``INSERT ... RETURNING`` and every waiting caller gets its own row back.
+    A submission whose email already has a lead created within
+    ``dedup_window`` (or earlier in the same batch) is merged into that lead
+    instead of creating a new one. Every submission id is recorded in
+    ``lead_submissions`` so spool replay skips the ones written here.
+    """
+
+    def __init__(self, max_delay_ms: int, max_size: int, dedup_window_seconds: int):
+        self.max_delay = max_delay_ms / 1000
+        self.max_size = max_size
+        self.dedup_window = timedelta(seconds=dedup_window_seconds)
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set = set()
+
+    async def submit(self, data: Dict[str, Any]) -> Lead:
+        """Queue a lead and wait until the batch containing it is committed"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((data, future))
+        if len(self._pending) >= self.max_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._start_flush)
+        return await future
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            leads = await self._write(batch)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), lead in zip(batch, leads):
+            if not future.done():
+                future.set_result(lead)
+
+    async def _write(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> List[Lead]:
+        now = datetime.utcnow()
+        emails = {data["email"] for data, _ in batch}
+
+        async with async_session_factory() as session:
+            async with session.begin():
+                # Most recent lead per email inside the window, via the email index
+                result = await session.execute(
+                    select(Lead)
+                    .filter(Lead.email.in_(emails), Lead.created_at >= now - self.dedup_window)
+                    .order_by(Lead.id)
+                )
+                existing: Dict[str, Lead] = {lead.email: lead for lead in result.scalars()}
+
+                # Collapse the batch to one entry per email, later fields winning
+                merged: Dict[str, Dict[str, Any]] = {}
+                for data, _ in batch:
+                    target = merged.setdefault(data["email"], dict(data))
+                    for field in MERGED_FIELDS:
+                        if data.get(field) is not None:
+                            target[field] = data[field]
+
+                new_rows = [
+                    {**data, "created_at": now, "updated_at": now}
+                    for email, data in merged.items()
+                    if email not in existing
+                ]
+
+                for email, data in merged.items():
+                    lead = existing.get(email)
+                    if lead is None:
+                        continue
+                    changes = {
+                        field: data[field]
+                        for field in MERGED_FIELDS
+                        if data.get(field) is not None and data[field] != getattr(lead, field)
+                    }
+                    if changes:
+                        for field, value in changes.items():
+                            setattr(lead, field, value)
+                        lead.updated_at = now
+
+                if new_rows:
+                    inserted = await session.scalars(
+                        insert(Lead).returning(Lead, sort_by_parameter_order=True),
+                        new_rows,
+                    )
+                    for lead in inserted.all():
+                        existing[lead.email] = lead
+
+                # Record every submission, merged ones included. A submission
+                # spooled after a timeout and already replayed conflicts here
+                # and fails the batch rather than being written twice.
+                submissions = [
+                    {
+                        "submission_id": data["submission_id"],
+                        "lead_id": existing[data["email"]].id,
+                        "created_at": now,
+                    }
+                    for data, _ in batch
+                    if data.get("submission_id")
+                ]
+                if submissions:
+                    await session.execute(insert(LeadSubmission), submissions)
+
+        return [existing[data["email"]] for data, _ in batch]
+
+    async def close(self) -> None:
+        """Flush anything still buffered and wait for in-flight batches"""
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+
+lead_writer = LeadBatchWriter(
+    max_delay_ms=settings.LEAD_BATCH_MAX_DELAY_MS,
+    max_size=settings.LEAD_BATCH_MAX_SIZE,
+    dedup_window_seconds=settings.LEAD_DEDUP_WINDOW_SECONDS,
+)
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import markdown
+import nh3
+
+from app.core.config import settings
+
+MARKDOWN_EXTENSIONS = ["toc", "fenced_code", "tables", "sane_lists"]
+
+# nh3 defaults plus heading ids, so table-of-contents anchors survive sanitizing
+ALLOWED_ATTRIBUTES = {
+    **nh3.ALLOWED_ATTRIBUTES,
+    **{f"h{level}": {"id"} for level in range(1, 7)},
+}
+
+
+def _toc_entries(tokens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "level": token["level"],
+            "id": token["id"],
+            "name": token["name"],
+            "children": _toc_entries(token["children"]),
+        }
+        for token in tokens
+    ]
+
+
+def render_markdown(content: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """Render Markdown to sanitized HTML plus a nested table of contents.
+
+    Module-level so it can be shipped to worker processes.
+    """
+    md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    html = md.convert(content)
+    return nh3.clean(html, attributes=ALLOWED_ATTRIBUTES), _toc_entries(md.toc_tokens)
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class MarkdownService:
+    """Renders Markdown once per distinct content, off the event loop.
+
+    Results are keyed by the SHA-256 of the source, both in a bounded
+    in-process LRU and in the ``content_hash`` column stored next to the
+    rendered HTML, so unchanged content is never rendered twice.
+    """
+
+    def __init__(self, max_workers: int, cache_size: int):
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[str, Tuple[str, List[Dict[str, Any]]]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def render(self, content: str) -> Tuple[str, str, List[Dict[str, Any]]]:
+        """Return (content_hash, html, toc) for the given Markdown"""
+        digest = content_hash(content)
+
+        cached = self._cache.get(digest)
+        if cached is not None:
+            self._cache.move_to_end(digest)
+            return (digest, *cached)
+
+        # Identical content submitted concurrently shares one render. Callers
+        # await it shielded, so one of them being cancelled (a client
+        # disconnecting) does not cancel the render for the others.
+        pending = self._pending.get(digest)
+        if pending is None:
+            loop = asyncio.get_running_loop()
+            pending = asyncio.ensure_future(
+                loop.run_in_executor(self._get_executor(), render_markdown, content)
+            )
+            self._pending[digest] = pending
+            pending.add_done_callback(lambda future: self._finish(digest, future))
+        rendered = await asyncio.shield(pending)
+        return (digest, *rendered)
+
+    def _finish(self, digest: str, future: asyncio.Future) -> None:
+        """Drop a finished render from ``_pending`` and cache it if it succeeded"""
+        self._pending.pop(digest, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._cache[digest] = future.result()
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def apply(self, obj) -> bool:
+        """Fill ``content_html``/``content_toc`` on a model with a ``content`` column.
+
+        Returns False without rendering when the stored hash already matches.
+        """
+        digest = content_hash(obj.content)
+        if obj.content_hash == digest and obj.content_html is not None:
+            return False
+        obj.content_hash, obj.content_html, obj.content_toc = await self.render(obj.content)
+        return True
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+markdown_service = MarkdownService(
+    max_workers=settings.MARKDOWN_RENDER_WORKERS,
+    cache_size=settings.MARKDOWN_RENDER_CACHE_SIZE,
+)
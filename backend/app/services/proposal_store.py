@@ -0,0 +1,113 @@
+"""
+Compressed, delta-encoded storage for proposal versions.
+"""
+
+import json
+import zlib
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Optional, Tuple
+
+from app.core.config import settings
+
+# Values of Proposal.content_encoding. NULL means plain text in ``content``.
+ENCODING_FULL = "zlib"
+ENCODING_DELTA = "zlib-delta"
+
+COMPRESSION_LEVEL = 6
+
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_text(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
+def make_delta(base: str, text: str) -> bytes:
+    """Encode ``text`` as line operations against ``base``.
+
+    The delta is a JSON list where ``[start, end]`` copies base lines and a
+    string inserts new text, compressed as a whole.
+    """
+    base_lines = base.splitlines(keepends=True)
+    lines = text.splitlines(keepends=True)
+    ops = []
+    matcher = SequenceMatcher(None, base_lines, lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(lines[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    base_lines = base.splitlines(keepends=True)
+    parts = []
+    for op in json.loads(zlib.decompress(delta)):
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(base_lines[op[0]:op[1]])
+    return "".join(parts)
+
+
+class ProposalStore:
+    """Encoding policy plus an LRU of reconstructed proposal versions.
+
+    Version 1 and every ``checkpoint_interval``-th version after it are stored
+    as a compressed full copy; the others as a compressed line delta against
+    the previous version, so rebuilding any version reads at most one
+    checkpoint interval of rows. Cache entries are keyed by row id and
+    content hash, so an edited version is never served stale.
+    """
+
+    def __init__(self, checkpoint_interval: int, cache_size: int):
+        self.checkpoint_interval = max(1, checkpoint_interval)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[int, str], str]" = OrderedDict()
+
+    def checkpoint_for(self, version: int) -> int:
+        """The checkpoint version a version's delta chain starts from"""
+        return version - (version - 1) % self.checkpoint_interval
+
+    def is_checkpoint(self, version: int) -> bool:
+        return self.checkpoint_for(version) == version
+
+    def encode(self, version: int, text: str, base: Optional[str]) -> Tuple[str, bytes]:
+        """Return (content_encoding, content_delta) for a version.
+
+        ``base`` is the text of the previous version, or None if it is unknown.
+        """
+        if base is None or self.is_checkpoint(version):
+            return ENCODING_FULL, compress_text(text)
+        return ENCODING_DELTA, make_delta(base, text)
+
+    def decode(self, encoding: str, data: bytes, base: Optional[str]) -> str:
+        if encoding == ENCODING_FULL:
+            return decompress_text(data)
+        if base is None:
+            raise ValueError("Delta-encoded proposal version is missing its base version")
+        return apply_delta(base, data)
+
+    def get(self, proposal_id: int, digest: Optional[str]) -> Optional[str]:
+        key = (proposal_id, digest)
+        text = self._cache.get(key)
+        if text is not None:
+            self._cache.move_to_end(key)
+        return text
+
+    def set(self, proposal_id: int, digest: Optional[str], text: str) -> None:
+        key = (proposal_id, digest)
+        self._cache[key] = text
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+proposal_store = ProposalStore(
+    checkpoint_interval=settings.PROPOSAL_CHECKPOINT_INTERVAL,
+    cache_size=settings.PROPOSAL_CACHE_SIZE,
+)
@@ -0,0 +1,506 @@
+"""
+In-process HTTP benchmark across the auth, leads, blogs, projects and upload routers.
+
+Boots the ASGI app in this process (lifespan included), seeds the configured
+database, replaces the Gemini API with a local stub and drives a weighted
+request mix from concurrent clients. Reports throughput and p50/p95/p99 per
+endpoint and saves the run as JSON; ``--compare`` diffs against an earlier run:
+
+    python -m benchmarks.http_bench --duration 30 --concurrency 32
+    python -m benchmarks.http_bench --compare benchmarks/results/<earlier>.json
+
+Seeding writes to DATABASE_URL, so point it at a scratch database (SQLite
+works; PostgreSQL needs the migrations applied first). Needs httpx.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BENCH_DOMAIN = "bench.example.com"
+BENCH_PASSWORD = "bench-password-1"
+# Smallest valid PNG, for the upload route
+PNG_BYTES = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+STUB_PROPOSAL = "# Proposal\n\n## Goals\n\n" + "\n".join(f"- Deliverable {i}" for i in range(40))
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self._text = text
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return {"candidates": [{"content": {"parts": [{"text": self._text}]}}]}
+
+
+class StubRequests:
+    """Stands in for the ``requests`` module inside AIService.
+
+    Sleeps for the configured upstream latency; like the real call it blocks
+    the thread it runs on, so the benchmark keeps the production behaviour.
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def post(self, url, headers=None, json=None):
+        time.sleep(self.latency)
+        return StubResponse(STUB_PROPOSAL)
+
+
+@dataclass
+class BenchContext:
+    admin_email: str
+    user_emails: List[str]
+    post_ids: List[int]
+    lead_ids: List[int]
+    # Filled in after login
+    tokens: Dict[str, str] = field(default_factory=dict)
+    projects: Dict[str, List[int]] = field(default_factory=dict)
+
+
+async def seed(users: int, rng: random.Random) -> BenchContext:
+    """Create the benchmark dataset unless an earlier run already did"""
+    from sqlalchemy import insert, select
+
+    from app.core.db import Base, async_session_factory, engine
+    from app.core.security import password_helper
+    from app.db.project import ProjectCRUD
+    from app.models.blog import BlogPost
+    from app.models.comment import BlogComment
+    from app.models.lead import Lead
+    from app.models.project import OnboardingForm, Project
+    from app.models.user import User
+    from app.schemas.project import ProposalCreate
+
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    admin_email = f"admin@{BENCH_DOMAIN}"
+    user_emails = [f"user{i}@{BENCH_DOMAIN}" for i in range(users)]
+    async with async_session_factory() as db:
+        existing = set((await db.scalars(
+            select(User.email).filter(User.email.like(f"%@{BENCH_DOMAIN}"))
+        )).all())
+        hashed = password_helper.hash(BENCH_PASSWORD)
+        missing = [email for email in [admin_email, *user_emails] if email not in existing]
+        if missing:
+            await db.execute(insert(User), [
+                {
+                    "email": email,
+                    "hashed_password": hashed,
+                    "is_active": True,
+                    "is_superuser": email == admin_email,
+                    "is_verified": True,
+                }
+                for email in missing
+            ])
+
+        user_ids = dict((await db.execute(
+            select(User.email, User.id).filter(User.email.in_(missing))
+        )).all())
+        for email in missing:
+            for n in range(2):
+                project = (await db.execute(
+                    insert(Project)
+                    .values(user_id=user_ids[email], name=f"Bench project {n}", status="Active")
+                    .returning(Project)
+                )).scalar_one()
+                await db.execute(insert(OnboardingForm).values(
+                    project_id=project.id,
+                    form_data={"project_goals": "Automate intake", "budget": "$25,000"},
+                    processing_status="completed",
+                ))
+                for version in range(3):
+                    await ProjectCRUD.create_proposal(db, ProposalCreate(
+                        project_id=project.id,
+                        content=STUB_PROPOSAL + f"\n\nRevision {version}: " + " ".join(
+                            rng.choice(["scope", "timeline", "budget", "risks"]) for _ in range(30)
+                        ),
+                    ))
+
+        post_ids = (await db.scalars(select(BlogPost.id).order_by(BlogPost.id))).all()
+        if len(post_ids) < 100:
+            await db.execute(insert(BlogPost), [
+                {
+                    "title": f"Workflow notes {i}",
+                    "content": f"# Workflow {i}\n\nHow teams automate {rng.choice(['intake', 'billing', 'review'])} "
+                               f"with documents and approvals.\n\n" + "Details. " * 50,
+                    "category": rng.choice(["automation", "ai", "operations"]),
+                }
+                for i in range(100 - len(post_ids))
+            ])
+            post_ids = (await db.scalars(select(BlogPost.id).order_by(BlogPost.id))).all()
+            all_user_ids = (await db.scalars(
+                select(User.id).filter(User.email.like(f"%@{BENCH_DOMAIN}"))
+            )).all()
+            await db.execute(insert(BlogComment), [
+                {"post_id": post_id, "user_id": rng.choice(all_user_ids), "content": f"Comment {n}"}
+                for post_id in post_ids
+                for n in range(5)
+            ])
+
+        lead_ids = (await db.scalars(select(Lead.id).limit(5000))).all()
+        if len(lead_ids) < 2000:
+            await db.execute(insert(Lead), [
+                {
+                    "name": f"Lead {i}",
+                    "email": f"lead{i}@{BENCH_DOMAIN}",
+                    "company": rng.choice(["Acme", "Globex", "Initech", None]),
+                    "business_need": "Automate document review",
+                }
+                for i in range(2000)
+            ])
+            lead_ids = (await db.scalars(select(Lead.id).limit(5000))).all()
+        await db.commit()
+
+    return BenchContext(admin_email, user_emails, list(post_ids), list(lead_ids))
+
+
+# A scenario issues one request and returns the endpoint label and response
+Scenario = Callable[["BenchClient", random.Random], Awaitable[Tuple[str, int]]]
+
+
+class BenchClient:
+    """httpx client over the in-process app, with the benchmark's seeded state."""
+
+    def __init__(self, client, ctx: BenchContext, api: str):
+        self.client = client
+        self.ctx = ctx
+        self.api = api
+
+    async def call(self, label: str, method: str, path: str, token: Optional[str] = None, **kwargs) -> Tuple[str, int]:
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = await self.client.request(method, self.api + path, headers=headers, **kwargs)
+        return label, response.status_code
+
+    def user(self, rng: random.Random) -> Tuple[str, str]:
+        email = rng.choice(self.ctx.user_emails)
+        return email, self.ctx.tokens[email]
+
+
+async def login(bench: BenchClient, rng: random.Random):
+    email = rng.choice(bench.ctx.user_emails)
+    return await bench.call("POST /auth/jwt/login", "POST", "/auth/jwt/login",
+                            data={"username": email, "password": BENCH_PASSWORD})
+
+
+async def me(bench: BenchClient, rng: random.Random):
+    return await bench.call("GET /users/me", "GET", "/users/me", bench.user(rng)[1])
+
+
+async def create_lead(bench: BenchClient, rng: random.Random):
+    n = rng.randrange(10**9)
+    return await bench.call("POST /leads/", "POST", "/leads/", json={
+        "name": f"Bench Lead {n}", "email": f"new{n}@{BENCH_DOMAIN}",
+        "company": "Acme", "business_need": "Automate intake",
+    })
+
+
+async def list_leads(bench: BenchClient, rng: random.Random):
+    return await bench.call("GET /leads/", "GET", "/leads/?limit=100", bench.ctx.tokens[bench.ctx.admin_email])
+
+
+async def lead_analytics(bench: BenchClient, rng: random.Random):
+    return await bench.call("GET /leads/analytics/daily", "GET", "/leads/analytics/daily",
+                            bench.ctx.tokens[bench.ctx.admin_email])
+
+
+async def get_lead(bench: BenchClient, rng: random.Random):
+    return await bench.call("GET /leads/{lead_id}", "GET", f"/leads/{rng.choice(bench.ctx.lead_ids)}",
+                            bench.user(rng)[1])
+
+
+async def public_posts(bench: BenchClient, rng: random.Random):
+    return await bench.call("GET /blogs/public/", "GET", "/blogs/public/?limit=20")
+
+
+async def public_post(bench: BenchClient, rng: random.Random):
+    return await bench.call("GET /blogs/public/{post_id}", "GET", f"/blogs/public/{rng.choice(bench.ctx.post_ids)}")
+
+
+async def search_posts(bench: BenchClient, rng: random.Random):
+    term = rng.choice(["intake", "billing", "review", "approvals", "workflow"])
+    return await bench.call("GET /blogs/public/search", "GET", f"/blogs/public/search?q={term}")
+
+
+async def post_comments(bench: BenchClient, rng: random.Random):
+    return await bench.call("GET /blogs/{post_id}/comments", "GET", f"/blogs/{rng.choice(bench.ctx.post_ids)}/comments")
+
+
+async def create_comment(bench: BenchClient, rng: random.Random):
+    return await bench.call("POST /blogs/comments/", "POST", "/blogs/comments/", bench.user(rng)[1],
+                            json={"post_id": rng.choice(bench.ctx.post_ids), "content": "Benchmark comment"})
+
+
+async def list_projects(bench: BenchClient, rng: random.Random):
+    return await bench.call("GET /projects/", "GET", "/projects/", bench.user(rng)[1])
+
+
+async def dashboard(bench: BenchClient, rng: random.Random):
+    return await bench.call("GET /projects/dashboard", "GET", "/projects/dashboard", bench.user(rng)[1])
+
+
+async def get_project(bench: BenchClient, rng: random.Random):
+    email, token = bench.user(rng)
+    project_id = rng.choice(bench.ctx.projects[email])
+    return await bench.call("GET /projects/{project_id}", "GET", f"/projects/{project_id}", token)
+
+
+async def proposals(bench: BenchClient, rng: random.Random):
+    email, token = bench.user(rng)
+    project_id = rng.choice(bench.ctx.projects[email])
+    return await bench.call("GET /projects/{project_id}/proposals", "GET", f"/projects/{project_id}/proposals", token)
+
+
+async def proposal_versions(bench: BenchClient, rng: random.Random):
+    email, token = bench.user(rng)
+    project_id = rng.choice(bench.ctx.projects[email])
+    return await bench.call("GET /projects/{project_id}/proposals/versions", "GET",
+                            f"/projects/{project_id}/proposals/versions", token)
+
+
+async def generate_proposal(bench: BenchClient, rng: random.Random):
+    email, token = bench.user(rng)
+    project_id = rng.choice(bench.ctx.projects[email])
+    return await bench.call("POST /projects/{project_id}/proposals", "POST", f"/projects/{project_id}/proposals", token)
+
+
+async def submit_onboarding(bench: BenchClient, rng: random.Random):
+    email, token = bench.user(rng)
+    project_id = rng.choice(bench.ctx.projects[email])
+    return await bench.call("POST /projects/{project_id}/onboarding", "POST", f"/projects/{project_id}/onboarding",
+                            token, data={"form_data": json.dumps({"project_goals": "Automate intake"})})
+
+
+async def upload(bench: BenchClient, rng: random.Random):
+    return await bench.call("POST /upload/", "POST", "/upload/", bench.ctx.tokens[bench.ctx.admin_email],
+                            files={"file": ("bench.png", PNG_BYTES, "image/png")})
+
+
+# Relative weights per router, roughly the production mix: public reads dominate
+MIX: Dict[str, List[Tuple[int, Scenario]]] = {
+    "auth": [(1, login), (4, me)],
+    "leads": [(4, create_lead), (1, list_leads), (1, lead_analytics), (1, get_lead)],
+    "blogs": [(12, public_posts), (12, public_post), (4, search_posts), (4, post_comments), (1, create_comment)],
+    "projects": [
+        (4, list_projects), (6, dashboard), (4, get_project), (3, proposals),
+        (2, proposal_versions), (1, generate_proposal), (1, submit_onboarding),
+    ],
+    "upload": [(1, upload)],
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    # Multiply before dividing so whole-number ranks stay exact in floating point
+    rank = max(math.ceil(pct * len(sorted_values) / 100) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: Dict[str, List[float]], statuses: Dict[str, Counter], elapsed: float) -> dict:
+    endpoints = {}
+    for label in sorted(latencies):
+        values = sorted(latencies[label])
+        errors = sum(count for status, count in statuses[label].items() if status == "error" or int(status) >= 500)
+        endpoints[label] = {
+            "requests": len(values),
+            "errors": errors,
+            "throughput_rps": len(values) / elapsed,
+            "mean_ms": sum(values) / len(values) * 1000,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "max_ms": values[-1] * 1000,
+            "statuses": dict(statuses[label]),
+        }
+    all_values = sorted(value for values in latencies.values() for value in values)
+    total = {
+        "requests": len(all_values),
+        "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+        "throughput_rps": len(all_values) / elapsed,
+        "p50_ms": percentile(all_values, 50) * 1000,
+        "p95_ms": percentile(all_values, 95) * 1000,
+        "p99_ms": percentile(all_values, 99) * 1000,
+    }
+    return {"endpoints": endpoints, "total": total}
+
+
+async def run(args) -> dict:
+    import httpx
+    from sqlalchemy import select
+
+    from app.api import upload as upload_api
+    from app.api.users import get_jwt_strategy
+    from app.core.db import async_session_factory
+    from app.models.user import User
+    from app.core.config import settings
+    from app.main import app
+    from app.services import ai_service
+
+    # The LLM stub replaces the HTTP call only, so AIService's own code still runs
+    ai_service.requests = StubRequests(args.llm_latency_ms / 1000)
+    upload_api.UPLOAD_DIR = tempfile.mkdtemp(prefix="bench-uploads-")
+
+    rng = random.Random(args.seed)
+    ctx = await seed(args.users, rng)
+    scenarios = [(weight, scenario) for router in args.routers for weight, scenario in MIX[router]]
+    weights = [weight for weight, _ in scenarios]
+    functions = [scenario for _, scenario in scenarios]
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            bench = BenchClient(client, ctx, settings.API_V1_STR)
+            # Mint tokens directly; the auth mix still exercises the login route
+            async with async_session_factory() as db:
+                users = (await db.scalars(select(User).filter(User.email.like(f"%@{BENCH_DOMAIN}")))).all()
+            strategy = get_jwt_strategy()
+            for user in users:
+                ctx.tokens[user.email] = await strategy.write_token(user)
+            for email in ctx.user_emails:
+                response = await client.get(f"{settings.API_V1_STR}/projects/", headers={
+                    "Authorization": f"Bearer {ctx.tokens[email]}"})
+                ctx.projects[email] = [project["id"] for project in response.json()]
+
+            start = time.perf_counter()
+            measure_from = start + args.warmup
+            stop_at = measure_from + args.duration
+
+            async def worker(worker_id: int) -> None:
+                worker_rng = random.Random(args.seed * 1000 + worker_id)
+                while time.perf_counter() < stop_at:
+                    scenario = worker_rng.choices(functions, weights)[0]
+                    began = time.perf_counter()
+                    try:
+                        label, status = await scenario(bench, worker_rng)
+                    except Exception as e:
+                        label, status = scenario.__name__, "error"
+                        print(f"{scenario.__name__} failed: {e}")
+                    if began >= measure_from:
+                        latencies[label].append(time.perf_counter() - began)
+                        statuses[label][str(status)] += 1
+
+            await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+
+    result = summarize(latencies, statuses, args.duration)
+    result["meta"] = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "database": settings.DATABASE_URL.split("://", 1)[0],
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "concurrency": args.concurrency,
+        "users": args.users,
+        "seed": args.seed,
+        "llm_latency_ms": args.llm_latency_ms,
+        "routers": args.routers,
+        "admission_control": settings.ADMISSION_CONTROL_ENABLED,
+    }
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result: dict) -> None:
+    print(f"{'endpoint':<48} {'req':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for label, stats in result["endpoints"].items():
+        print(f"{label:<48} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8.1f} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+    total = result["total"]
+    print(f"{'total':<48} {total['requests']:>7} {total['errors']:>5} {total['throughput_rps']:>8.1f} "
+          f"{total['p50_ms']:>8.1f} {total['p95_ms']:>8.1f} {total['p99_ms']:>8.1f}")
+
+
+def compare(result: dict, baseline: dict, threshold: Optional[float]) -> int:
+    """Print p95 changes against a baseline run; returns how many exceed ``threshold`` percent"""
+    regressions = 0
+    print(f"\n{'endpoint':<48} {'base p95':>9} {'p95':>9} {'change':>8}")
+    for label, stats in result["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(label)
+        if before is None or not before["p95_ms"]:
+            continue
+        change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        flag = ""
+        if threshold is not None and change > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{label:<48} {before['p95_ms']:>9.1f} {stats['p95_ms']:>9.1f} {change:>+7.1f}%{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the API in-process against a seeded database")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds before measuring")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--users", type=int, default=50, help="seeded users, two projects each")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for data and request mix")
+    parser.add_argument("--llm-latency-ms", type=float, default=800, help="latency of the stubbed Gemini API")
+    parser.add_argument("--routers", default=",".join(MIX), help=f"comma-separated subset of {','.join(MIX)}")
+    parser.add_argument("--with-admission", action="store_true",
+                        help="keep admission control on (anonymous routes may be shed with 429)")
+    parser.add_argument("--output", type=Path, help="result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier result file to diff p95 against")
+    parser.add_argument("--fail-threshold", type=float,
+                        help="with --compare, exit 1 if any endpoint's p95 grew by more than this percent")
+    args = parser.parse_args()
+    args.routers = [router.strip() for router in args.routers.split(",") if router.strip()]
+    unknown = set(args.routers) - set(MIX)
+    if unknown:
+        parser.error(f"unknown routers: {', '.join(sorted(unknown))}")
+
+    # Settings are read at import time, so these must precede importing the app
+    if not args.with_admission:
+        os.environ["ADMISSION_CONTROL_ENABLED"] = "false"
+    os.environ.setdefault("LEAD_SCORING_ENABLED", "false")
+
+    result = asyncio.run(run(args))
+    print_report(result)
+
+    output = args.output or RESULTS_DIR / f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        regressions = compare(result, json.loads(args.compare.read_text()), args.fail_threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+-- Baseline schema: the tables as they were before versioned migrations.
+-- Everything is IF NOT EXISTS so databases created from the old sql/ files
+-- or by SQLAlchemy's create_all can adopt the migration history as-is.
+
+-- Databases seeded from the old mock_data.sql used different names for a
+-- few columns and for the onboarding table; bring them in line first.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'users' AND column_name = 'password_hash')
+       AND NOT EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_name = 'users' AND column_name = 'hashed_password') THEN
+        ALTER TABLE users RENAME COLUMN password_hash TO hashed_password;
+    END IF;
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'users' AND column_name = 'is_admin')
+       AND NOT EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_name = 'users' AND column_name = 'is_superuser') THEN
+        ALTER TABLE users RENAME COLUMN is_admin TO is_superuser;
+    END IF;
+    IF to_regclass('onboarding_data') IS NOT NULL AND to_regclass('onboarding_forms') IS NULL THEN
+        ALTER TABLE onboarding_data RENAME TO onboarding_forms;
+        ALTER TABLE onboarding_forms RENAME COLUMN created_at TO submitted_at;
+    END IF;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    email VARCHAR NOT NULL,
+    hashed_password VARCHAR NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE,
+    is_superuser BOOLEAN DEFAULT FALSE,
+    is_verified BOOLEAN NOT NULL DEFAULT FALSE,
+    first_name VARCHAR(50),
+    last_name VARCHAR(50)
+);
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS is_active BOOLEAN DEFAULT TRUE;
+ALTER TABLE users ADD COLUMN IF NOT EXISTS is_verified BOOLEAN NOT NULL DEFAULT FALSE;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users(email);
+
+CREATE TABLE IF NOT EXISTS projects (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    name VARCHAR(255) NOT NULL,
+    description TEXT,
+    status VARCHAR(50) DEFAULT 'Pending',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS status VARCHAR(50) DEFAULT 'Pending';
+
+CREATE TABLE IF NOT EXISTS onboarding_forms (
+    id SERIAL PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    form_data JSONB NOT NULL,
+    file_path VARCHAR(255),
+    processing_status VARCHAR(50) DEFAULT 'pending',
+    extracted_data JSONB,
+    submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE onboarding_forms ADD COLUMN IF NOT EXISTS file_path VARCHAR(255);
+ALTER TABLE onboarding_forms ADD COLUMN IF NOT EXISTS processing_status VARCHAR(50) DEFAULT 'pending';
+ALTER TABLE onboarding_forms ADD COLUMN IF NOT EXISTS extracted_data JSONB;
+
+CREATE TABLE IF NOT EXISTS proposals (
+    id SERIAL PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    version INTEGER NOT NULL DEFAULT 1,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS blog_posts (
+    id SERIAL PRIMARY KEY,
+    title VARCHAR(255) NOT NULL,
+    content TEXT NOT NULL,
+    image_url VARCHAR(500),
+    category VARCHAR(100),
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS blog_comments (
+    id SERIAL PRIMARY KEY,
+    post_id INTEGER REFERENCES blog_posts(id) ON DELETE CASCADE,
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    parent_id INTEGER REFERENCES blog_comments(id) ON DELETE CASCADE,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS leads (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(320) NOT NULL,
+    company VARCHAR(100),
+    business_need TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_leads_email ON leads(email);
@@ -0,0 +1,24 @@
+-- Full-text search for blog posts.
+-- Title matches weigh most, then category, then body.
+
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+CREATE OR REPLACE FUNCTION blog_posts_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.category, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.content, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS blog_posts_search_vector_trigger ON blog_posts;
+CREATE TRIGGER blog_posts_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, content, category ON blog_posts
+    FOR EACH ROW EXECUTE FUNCTION blog_posts_search_vector_update();
+
+-- Backfill existing rows
+UPDATE blog_posts SET title = title WHERE search_vector IS NULL;
+
+CREATE INDEX IF NOT EXISTS ix_blog_posts_search_vector ON blog_posts USING GIN (search_vector);
@@ -0,0 +1,10 @@
+-- Server-side rendered Markdown, stored next to the source.
+-- content_hash is the SHA-256 of `content` the HTML was rendered from.
+
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS content_html TEXT;
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS content_toc JSONB;
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+ALTER TABLE proposals ADD COLUMN IF NOT EXISTS content_html TEXT;
+ALTER TABLE proposals ADD COLUMN IF NOT EXISTS content_toc JSONB;
+ALTER TABLE proposals ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
@@ -0,0 +1,5 @@
+-- Idempotency key for lead submissions, used when replaying the local spool.
+
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS submission_id VARCHAR(36);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_leads_submission_id ON leads(submission_id);
@@ -0,0 +1,17 @@
+-- Incrementally maintained lead analytics (see app/services/lead_rollup.py).
+
+CREATE TABLE IF NOT EXISTS lead_rollups (
+    day DATE NOT NULL,
+    dimension VARCHAR(32) NOT NULL,  -- total | company | business_need
+    value VARCHAR(200) NOT NULL,
+    lead_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, dimension, value)
+);
+
+CREATE INDEX IF NOT EXISTS ix_lead_rollups_dimension_day ON lead_rollups(dimension, day);
+
+CREATE TABLE IF NOT EXISTS lead_rollup_state (
+    name VARCHAR(64) PRIMARY KEY,
+    last_lead_id INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP
+);
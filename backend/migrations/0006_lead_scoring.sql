@@ -0,0 +1,9 @@
+-- AI lead classification (see app/services/lead_scoring.py).
+
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS intent VARCHAR(50);
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS urgency VARCHAR(20);
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS fit_score SMALLINT;
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS scored_at TIMESTAMP;
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS score_attempts SMALLINT NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS ix_leads_unscored ON leads(id) WHERE scored_at IS NULL;
@@ -0,0 +1,30 @@
+-- Atomic proposal version allocation (see ProjectCRUD._get_next_proposal_version).
+
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS proposal_version INTEGER NOT NULL DEFAULT 0;
+
+-- Renumber projects whose history has versions duplicated by concurrent
+-- generations before the constraint goes on; order is kept
+UPDATE proposals p
+SET version = numbered.version
+FROM (
+    SELECT id, row_number() OVER (PARTITION BY project_id ORDER BY version, id) AS version
+    FROM proposals
+    WHERE project_id IN (
+        SELECT project_id FROM proposals GROUP BY project_id, version HAVING count(*) > 1
+    )
+) AS numbered
+WHERE numbered.id = p.id AND numbered.version <> p.version;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_proposals_project_version') THEN
+        ALTER TABLE proposals
+            ADD CONSTRAINT uq_proposals_project_version UNIQUE (project_id, version);
+    END IF;
+END
+$$;
+
+UPDATE projects pr
+SET proposal_version = latest.version
+FROM (SELECT project_id, max(version) AS version FROM proposals GROUP BY project_id) AS latest
+WHERE latest.project_id = pr.id;
@@ -0,0 +1,6 @@
+-- Compressed, delta-encoded proposal versions (see app/services/proposal_store.py).
+-- Existing rows keep their plain-text content and are read as full versions.
+
+ALTER TABLE proposals ALTER COLUMN content DROP NOT NULL;
+ALTER TABLE proposals ADD COLUMN IF NOT EXISTS content_encoding VARCHAR(20);
+ALTER TABLE proposals ADD COLUMN IF NOT EXISTS content_delta BYTEA;
@@ -0,0 +1,22 @@
+-- migrate: no-transaction
+-- Composite indexes for the hot project and blog queries, built without
+-- blocking writes. If a build fails it leaves an INVALID index behind that
+-- IF NOT EXISTS would skip: drop it and run the migration again.
+-- proposals(project_id, version) is already covered by the unique index
+-- behind uq_proposals_project_version (0007).
+
+-- Ownership checks plus the newest-first keyset paging of the dashboard
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_projects_user_id_id ON projects(user_id, id);
+DROP INDEX CONCURRENTLY IF EXISTS idx_projects_user_id;
+
+-- A project's forms, latest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_onboarding_forms_project_submitted
+    ON onboarding_forms(project_id, submitted_at);
+DROP INDEX CONCURRENTLY IF EXISTS idx_onboarding_project_id;
+
+-- A post's comments in thread order
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_blog_comments_post_created
+    ON blog_comments(post_id, created_at);
+
+-- Newest-first blog listings
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_blog_posts_created_at ON blog_posts(created_at);
@@ -0,0 +1,9 @@
+-- Every submission the batch writer or the spool replay has written, so a
+-- submission merged into another lead is not replayed as a new one
+-- (see app/services/lead_writer.py and app/services/lead_spool.py).
+
+CREATE TABLE IF NOT EXISTS lead_submissions (
+    submission_id VARCHAR(36) PRIMARY KEY,
+    lead_id INTEGER REFERENCES leads(id) ON DELETE CASCADE,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
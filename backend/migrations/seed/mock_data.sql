@@ -1,49 +1,12 @@
 -- Mock data for ArtOfWorkflows project proposals system
 
--- Create tables if they don't exist
-CREATE TABLE IF NOT EXISTS users (
-    id SERIAL PRIMARY KEY,
-    email VARCHAR(255) NOT NULL UNIQUE,
-    first_name VARCHAR(100),
-    last_name VARCHAR(100),
-    password_hash VARCHAR(255) NOT NULL,
-    is_admin BOOLEAN DEFAULT FALSE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
-CREATE TABLE IF NOT EXISTS projects (
-    id SERIAL PRIMARY KEY,
-    name VARCHAR(255) NOT NULL,
-    description TEXT,
-    user_id INTEGER REFERENCES users(id),
-    status VARCHAR(50) DEFAULT 'Active',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
-CREATE TABLE IF NOT EXISTS proposals (
-    id SERIAL PRIMARY KEY,
-    project_id INTEGER REFERENCES projects(id),
-    content TEXT NOT NULL,
-    version INTEGER DEFAULT 1,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
-CREATE TABLE IF NOT EXISTS onboarding_data (
-    id SERIAL PRIMARY KEY,
-    project_id INTEGER REFERENCES projects(id),
-    form_data JSONB NOT NULL,
-    file_path VARCHAR(255),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+-- Load after applying migrations: python -m app.core.migrations
 
 -- Clear existing data (if needed)
--- TRUNCATE users, projects, proposals, onboarding_data CASCADE;
+-- TRUNCATE users, projects, proposals, onboarding_forms CASCADE;
 
 -- Insert mock users
-INSERT INTO users (email, first_name, last_name, password_hash, is_admin)
+INSERT INTO users (email, first_name, last_name, hashed_password, is_superuser)
 VALUES 
     ('admin@example.com', 'Admin', 'User', '$2a$10$XQCJDUvI0YeAFzfBGUGTXO6RyBsAYfBKtKs7dZdXEeUOSq0Uw7VNO', TRUE),
     ('user@example.com', 'Regular', 'User', '$2a$10$XQCJDUvI0YeAFzfBGUGTXO6RyBsAYfBKtKs7dZdXEeUOSq0Uw7VNO', FALSE),
@@ -235,7 +198,7 @@ We recommend implementing a comprehensive behavior-driven email automation syste
 $15,000 - $18,000', 2);
 
 -- Insert mock onboarding data
-INSERT INTO onboarding_data (project_id, form_data)
+INSERT INTO onboarding_forms (project_id, form_data)
 VALUES 
     (1, '{"fullName": "Regular User", "email": "user@example.com", "companyName": "Acme Corp", "industryType": "SaaS", "technicalBackground": "api_scripting", "automationGoal": "Integrate our CRM system with marketing platforms to eliminate manual data entry and ensure consistent customer data across systems.", "tools": {"crm": true, "marketing": true, "api": true}, "needsThirdPartyApi": "yes", "currentProcess": "Currently, our team manually exports data from the CRM and imports it into our marketing platforms daily. This is time-consuming and error-prone.", "painPoints": "Data inconsistency, delays in marketing campaigns, manual errors, and wasted staff time.", "desiredWorkflow": "When a new lead is added to the CRM, automatically create or update the contact in our marketing platforms. When marketing engagement happens, update the CRM record with this information.", "triggers": {"apiRequest": true, "eventBased": true}, "timeline": "short", "hasBudget": "yes", "needsPlatformRecommendation": "yes", "needsAI": "no", "hasDocumentation": "yes", "additionalInfo": "We need this integration to be scalable as we plan to add more marketing tools in the future."}'),
     
@@ -247,6 +210,12 @@ VALUES
     
     (5, '{"fullName": "Regular User", "email": "user@example.com", "companyName": "Acme Corp", "industryType": "Manufacturing", "technicalBackground": "some_automation", "automationGoal": "Automate our inventory management process including tracking, reordering, and supplier communication.", "tools": {"database": true, "api": true, "productivity": true}, "needsThirdPartyApi": "yes", "currentProcess": "Inventory levels are checked manually, purchase orders are created in a separate system, and suppliers are contacted via email or phone.", "painPoints": "Stockouts, excess inventory, delayed reordering, and time-consuming manual processes.", "desiredWorkflow": "When inventory levels reach reorder points, automatically generate purchase orders, send them to suppliers, and update inventory projections. Provide alerts for exceptions requiring human intervention.", "triggers": {"scheduled": true, "eventBased": true}, "timeline": "long", "hasBudget": "yes", "needsPlatformRecommendation": "yes", "needsAI": "no", "hasDocumentation": "yes", "additionalInfo": "We have multiple warehouses and hundreds of SKUs that need to be managed in this system."}');
 
+-- Keep the proposal version counters in step with the inserted history
+UPDATE projects pr
+SET proposal_version = latest.version
+FROM (SELECT project_id, max(version) AS version FROM proposals GROUP BY project_id) AS latest
+WHERE latest.project_id = pr.id;
+
 -- You can add more mock data as needed
 
 -- Sample queries to verify the data
@@ -266,5 +235,5 @@ VALUES
 -- Get onboarding data for a specific project
 -- SELECT p.id, p.name, o.form_data
 -- FROM projects p
--- JOIN onboarding_data o ON p.id = o.project_id
+-- JOIN onboarding_forms o ON p.id = o.project_id
 -- WHERE p.id = 1; 
\ No newline at end of file
@@ -1,11 +0,0 @@
-CREATE TABLE projects (
-    id SERIAL PRIMARY KEY,
-    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-    name VARCHAR(255) NOT NULL,
-    description TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
-ALTER TABLE projects ADD COLUMN status VARCHAR(50) DEFAULT 'Pending';
-
-CREATE INDEX idx_projects_user_id ON projects(user_id);